@@ -1,22 +1,234 @@
+import json
+import re
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from utils.playback import PRIORITY_ALERT
 from utils.tts import speak
 
-class DoctorAgent:
+FALLBACK = "Sorry, I couldn’t connect to the doctor AI. Please check vitals manually."
+
+# Sentence boundary: terminal punctuation (incl. Devanagari danda) followed by whitespace
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+class CircuitBreaker:
+    # Opens after `threshold` consecutive failures; while open, calls are
+    # refused for `reset_after` seconds, then a single trial call decides
+    # whether to close again
+    def __init__(self, threshold=3, reset_after=30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self.opened_at >= self.reset_after:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+def normalize_prompt(text):
+    # "Critical vitals detected.  What to do?" and "critical vitals detected. what to do"
+    # are the same question
+    return " ".join(text.lower().split()).rstrip(" ?.!")
+
+class _Flight:
+    # One in-progress consultation that identical concurrent callers wait on
     def __init__(self):
-        self.ollama_url = "http://localhost:11434/api/generate"
+        self.done = threading.Event()
+        self.reply = FALLBACK
+
+class DoctorAgent:
+    def __init__(self, ollama_url="http://localhost:11434/api/generate", model="mistral",
+                 connect_timeout=3, read_timeout=60, retries=2, backoff=0.5, breaker=None, stream=True,
+                 cache_ttl=600, cache_size=256):
+        self.ollama_url = ollama_url
+        self.model = model
+        self.stream = stream
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        # Seconds from request to first token / first speech enqueued / full reply
+        self.last_timing = {}
+        # Replies by (normalized prompt, lang) -> (expires_at, reply), plus the
+        # consultations currently in flight so duplicates can join them
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache = {}
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        # Keep-alive connections to Ollama, shared by every consultation
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, prompt, stream):
+        # Connection errors, timeouts and 5xx are retried with exponential
+        # backoff; anything else fails straight away. For streaming requests
+        # only the wait for response headers is retried.
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.post(
+                    self.ollama_url,
+                    json={"model": self.model, "prompt": prompt, "stream": stream},
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                continue
+            if response.status_code >= 500 and attempt < self.retries:
+                response.close()
+                continue
+            response.raise_for_status()
+            return response
+
+    def _generate(self, prompt):
+        data = self._post(prompt, stream=False).json()
+        if data.get("error"):
+            raise RuntimeError(data["error"])
+        if not data.get("response", "").strip():
+            raise RuntimeError("empty reply")
+        return data["response"]
+
+    def _stream_sentences(self, prompt, start):
+        # Consume Ollama's NDJSON token stream and yield whole sentences as
+        # soon as each one is complete
+        with self._post(prompt, stream=True) as response:
+            pending = ""
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                token = chunk.get("response", "")
+                if token and "first_token" not in self.last_timing:
+                    self.last_timing["first_token"] = time.perf_counter() - start
+                parts = SENTENCE_END.split(pending + token)
+                for sentence in parts[:-1]:
+                    if sentence.strip():
+                        yield sentence.strip()
+                pending = parts[-1]
+                if chunk.get("done"):
+                    break
+            if pending.strip():
+                yield pending.strip()
 
     def consult(self, user_input, lang="ta"):
+        key = (normalize_prompt(user_input), lang)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self.cache_stats["hits"] += 1
+                print(f"🩺 Doctor (cached): {cached[1]}")
+                speak(cached[1], lang, PRIORITY_ALERT)
+                return cached[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.cache_stats["misses"] += 1
+            else:
+                self.cache_stats["coalesced"] += 1
+        if not leader:
+            # Someone is already asking this; their reply is being spoken now
+            flight.done.wait()
+            return flight.reply
+
+        try:
+            flight.reply, ok = self._ask(user_input, lang)
+            # Only a complete, non-empty answer is worth repeating from the cache
+            if ok and flight.reply.strip():
+                with self._cache_lock:
+                    if len(self._cache) >= self.cache_size:
+                        self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+                    if len(self._cache) < self.cache_size:
+                        self._cache[key] = (time.monotonic() + self.cache_ttl, flight.reply)
+        finally:
+            with self._cache_lock:
+                del self._inflight[key]
+            flight.done.set()
+        return flight.reply
+
+    def cache_hit_rate(self):
+        stats = self.cache_stats
+        total = stats["hits"] + stats["misses"] + stats["coalesced"]
+        return (stats["hits"] + stats["coalesced"]) / total if total else 0.0
+
+    def _ask(self, user_input, lang):
+        # Returns (reply, ok); only complete answers from the model are ok to cache
+        if not self.breaker.allow():
+            return self._fallback("doctor AI unavailable, not retrying yet", lang), False
+        prompt = f"As a doctor, advise: {user_input}"
+        start = time.perf_counter()
+        self.last_timing = {}
+        if self.stream:
+            return self._consult_streaming(prompt, lang, start)
         try:
-            response = requests.post(
-                self.ollama_url,
-                json={"model": "mistral", "prompt": f"As a doctor, advise: {user_input}", "stream": False}
-            )
-            reply = response.json()["response"]
-            print(f"🩺 Doctor: {reply}")
-            speak(reply, lang)
-            return reply
+            reply = self._generate(prompt)
         except Exception as e:
-            fallback = "Sorry, I couldn’t connect to the doctor AI. Please check vitals manually."
-            print(f"❌ Ollama error: {e}. {fallback}")
-            speak(fallback, lang)
-            return fallback
\ No newline at end of file
+            self.breaker.failure()
+            return self._fallback(e, lang), False
+        self.breaker.success()
+        elapsed = time.perf_counter() - start
+        self.last_timing = {"first_token": elapsed, "first_speech": elapsed, "total": elapsed}
+        print(f"🩺 Doctor: {reply}")
+        speak(reply, lang, PRIORITY_ALERT)
+        return reply, True
+
+    def _consult_streaming(self, prompt, lang, start):
+        # Each sentence goes to speech the moment it is complete, so the
+        # resident hears the start of the advice while the rest is generated
+        sentences = []
+        try:
+            for sentence in self._stream_sentences(prompt, start):
+                if not sentences:
+                    self.last_timing["first_speech"] = time.perf_counter() - start
+                print(f"🩺 Doctor: {sentence}")
+                speak(sentence, lang, PRIORITY_ALERT)
+                sentences.append(sentence)
+        except Exception as e:
+            self.breaker.failure()
+            if not sentences:
+                return self._fallback(e, lang), False
+            print(f"❌ Ollama stream interrupted: {e}")
+            return " ".join(sentences), False
+        if not sentences:
+            # A stream that ends without a word of advice is a failed consultation
+            self.breaker.failure()
+            return self._fallback("empty reply", lang), False
+        self.breaker.success()
+        self.last_timing["total"] = time.perf_counter() - start
+        return " ".join(sentences), True
+
+    def _fallback(self, error, lang):
+        print(f"❌ Ollama error: {error}. {FALLBACK}")
+        speak(FALLBACK, lang, PRIORITY_ALERT)
+        return FALLBACK
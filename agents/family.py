@@ -1,21 +1,172 @@
-import sqlite3
+import threading
+import time
+from array import array
 from datetime import datetime
+from utils.db import add_column, connect, get_writer
+from utils.outbox import create_outbox, idempotency_key, outbox_row
+from utils.timer_wheel import TimerWheel
+
+# A condition that keeps being reported is one incident: repeats within
+# SUPPRESSION_WINDOW of the last one only bump its count and last-seen time,
+# and the family hears about it again only when it has lasted long enough to
+# reach the next escalation tier. After a quiet window the incident closes.
+SUPPRESSION_WINDOW = 10 * 60  # seconds
+TIERS = ((0, "Family Alert"), (15 * 60, "Escalated to caregiver"), (60 * 60, "Escalated to emergency contact"))
+
+UPSERT_INCIDENT = """
+    INSERT INTO incidents (device_id, alert_type, message, first_seen, last_seen, count, tier, closed)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (device_id, alert_type, first_seen) DO UPDATE SET
+        message = excluded.message, last_seen = excluded.last_seen, count = excluded.count,
+        tier = excluded.tier, closed = excluded.closed
+"""
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+class IncidentTable:
+    # Open incidents keyed by (device_id, alert_type), stored column-wise like
+    # ResidentTable; slots of closed incidents are reused
+    FIELDS = {"first_seen": "d", "last_seen": "d", "count": "l", "tier": "b"}
+
+    def __init__(self):
+        self.index = {}
+        self.keys = []
+        self.messages = []
+        self.free = []
+        self.columns = {name: array(code) for name, code in self.FIELDS.items()}
+
+    def __len__(self):
+        return len(self.index)
+
+    def open(self, key, message, now):
+        slot = self.free.pop() if self.free else None
+        if slot is None:
+            slot = len(self.keys)
+            self.keys.append(None)
+            self.messages.append(None)
+            for values in self.columns.values():
+                values.append(0)
+        self.index[key] = slot
+        self.keys[slot], self.messages[slot] = key, message
+        columns = self.columns
+        columns["first_seen"][slot] = columns["last_seen"][slot] = now
+        columns["count"][slot], columns["tier"][slot] = 1, 0
+        return slot
+
+    def close(self, key):
+        slot = self.index.pop(key)
+        self.keys[slot] = self.messages[slot] = None
+        self.free.append(slot)
+        return slot
+
+    def row(self, slot, closed=0):
+        # Parameters for UPSERT_INCIDENT
+        (device_id, alert_type), columns = self.keys[slot], self.columns
+        return (device_id, alert_type, self.messages[slot], _timestamp(columns["first_seen"][slot]),
+                _timestamp(columns["last_seen"][slot]), columns["count"][slot], columns["tier"][slot], closed)
 
 class FamilyAgent:
-    def __init__(self, db_path="db/memory.sqlite"):
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""
+    # contacts: escalation tier -> [(channel, recipient)] who are notified
+    # through the outbox (utils/outbox.py) when an incident reaches that tier
+    def __init__(self, db_path="db/memory.sqlite", contacts=None):
+        conn = connect(db_path)
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS alerts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT,
                 message TEXT
             )
         """)
-        self.conn.commit()
+        add_column(conn, "alerts", "device_id", "TEXT")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS incidents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                device_id TEXT,
+                alert_type TEXT,
+                message TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                count INTEGER,
+                tier INTEGER,
+                closed INTEGER DEFAULT 0,
+                UNIQUE (device_id, alert_type, first_seen)
+            )
+        """)
+        conn.commit()
+        create_outbox(conn)
+        self.writer = get_writer(db_path)
+        self.contacts = contacts or {}
+        self.incidents = IncidentTable()
+        # When each open incident goes quiet long enough to close
+        self.quiet = TimerWheel(time.time())
+        self.stats = {"reported": 0, "notified": 0, "suppressed": 0, "opened": 0, "closed": 0}
+        # Health and safety ticks raise alerts from their own threads
+        self._lock = threading.Lock()
+
+    def send_alert(self, message, device_id=None, alert_type=None, now=None):
+        # Report that a condition holds; alert_type (default: the message)
+        # says which repeats are the same condition. Returns True if the
+        # family was notified, False if the report was folded into an open
+        # incident.
+        now = time.time() if now is None else now
+        key = (device_id or "", alert_type or message)
+        with self._lock:
+            self.stats["reported"] += 1
+            self._close_quiet(now)
+            incidents = self.incidents
+            slot = incidents.index.get(key)
+            if slot is None:
+                slot = incidents.open(key, message, now)
+                self.stats["opened"] += 1
+                tier = 0
+            else:
+                columns = incidents.columns
+                columns["last_seen"][slot] = now
+                columns["count"][slot] += 1
+                incidents.messages[slot] = message
+                tier = columns["tier"][slot]
+                while tier + 1 < len(TIERS) and now - columns["first_seen"][slot] >= TIERS[tier + 1][0]:
+                    tier += 1
+                if tier == columns["tier"][slot]:
+                    self.quiet.schedule(key, now + SUPPRESSION_WINDOW)
+                    self.stats["suppressed"] += 1
+                    return False
+                columns["tier"][slot] = tier
+            self.quiet.schedule(key, now + SUPPRESSION_WINDOW)
+            self.stats["notified"] += 1
+            count = incidents.columns["count"][slot]
+            row = incidents.row(slot)
+        label = TIERS[tier][1]
+        repeats = f" (x{count})" if count > 1 else ""
+        print(f" {label}: {message}{repeats}" + (f" [{device_id}]" if device_id else ""))
+        text = message if tier == 0 else f"{label}: {message}{repeats}"
+        # The alert, its incident and its deliveries commit together
+        statements = [("INSERT INTO alerts (timestamp, message, device_id) VALUES (?, ?, ?)",
+                       (_timestamp(now), text, device_id)),
+                      (UPSERT_INCIDENT, row)]
+        first_seen = row[3]
+        body = f"{text}\nResident: {device_id or '-'}\nFirst seen: {first_seen}\nReports: {count}"
+        for channel, recipient in self.contacts.get(tier, ()):
+            delivery_key = idempotency_key(*key, first_seen, tier, channel, recipient)
+            statements.append(outbox_row(delivery_key, channel, recipient, f"{label}: {message}", body))
+        self.writer.transaction(statements)
+        return True
+
+    def close_incidents(self, now=None):
+        # Close incidents that stayed quiet for SUPPRESSION_WINDOW, recording
+        # their final count and last-seen time; returns how many closed
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._close_quiet(now)
 
-    def send_alert(self, message):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f" Family Alert: {message}")
-        self.cursor.execute("INSERT INTO alerts (timestamp, message) VALUES (?, ?)", (now, message))
-        self.conn.commit()
\ No newline at end of file
+    def _close_quiet(self, now):
+        quiet = self.quiet.expire(now)
+        if quiet:
+            rows = []
+            for key in quiet:
+                rows.append(self.incidents.row(self.incidents.index[key], closed=1))
+                self.incidents.close(key)
+            self.writer.executemany(UPSERT_INCIDENT, rows)
+            self.stats["closed"] += len(quiet)
+        return len(quiet)
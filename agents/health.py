@@ -1,13 +1,25 @@
-import joblib
-import sqlite3
 from datetime import datetime
 import random
+import time
+import numpy as np
+from agents.residents import DEFAULT_DEVICE, ResidentTable
+from utils.compact_forest import load_model
+from utils.db import add_column, connect, get_writer
+from utils.features import HEALTH_FEATURES, FeatureSchema, schema_path
+from utils.rolling import RollingVitals, health_schema, timestamp_minutes
+
+# Column order expected by the model, also used to pick columns out of a DataFrame
+VITALS = HEALTH_FEATURES.names
+
+INSERT_LOG = """
+    INSERT INTO health_logs (timestamp, heart_rate, bp_systolic, bp_diastolic, is_critical, device_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 
 class HealthAgent:
-    def __init__(self, db_path="db/memory.sqlite"):
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""
+    def __init__(self, db_path="db/memory.sqlite", model_path="./health_model.pkl", device_ids=(DEFAULT_DEVICE,)):
+        conn = connect(db_path)
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS health_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT,
@@ -17,27 +29,95 @@ class HealthAgent:
                 is_critical INTEGER
             )
         """)
-        self.conn.commit()
+        add_column(conn, "health_logs", "device_id", "TEXT")
+        # History reads (utils/rollups.py) look up one device's time range
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_health_logs_device_time ON health_logs (device_id, timestamp)")
+        # Rows logged before device_id existed belong to the single resident
+        conn.execute("UPDATE health_logs SET device_id = ? WHERE device_id IS NULL", (DEFAULT_DEVICE,))
+        conn.commit()
+        self.writer = get_writer(db_path)
+        # Latest vitals per resident; IoT readings from new devices add rows
+        self.residents = ResidentTable(device_ids)
+        # Memory-mapped compact export when training produced one, else the pickle
         try:
-            self.model = joblib.load("./health_model.pkl")
+            self.model = load_model(model_path)
         except FileNotFoundError:
             print("❌ Run 'train_health_model.py' first to generate health_model.pkl")
             exit(1)
+        # The model must have been trained on exactly the features we feed it
+        try:
+            schema = FeatureSchema.load(schema_path(model_path))
+        except FileNotFoundError:
+            raise ValueError(f"{schema_path(model_path)} missing: the model predates feature schemas, "
+                             f"retrain it with train_health_model.py")
+        health_schema(schema.trend_window).check(schema)
+        if getattr(self.model, "n_features_in_", len(schema)) != len(schema):
+            raise ValueError(f"model takes {self.model.n_features_in_} features, schema lists {len(schema)}")
+        # Per-resident rolling history for trend-aware models, kept in memory
+        # so scoring never has to read health_logs back
+        self.trends = RollingVitals(schema.trend_window) if schema.trend_window else None
 
-    def monitor_health(self):
+    def monitor_health(self, device_id=DEFAULT_DEVICE):
         # Simulated input (replace with IoT later)
         hr = random.randint(65, 110)
         sys = random.randint(110, 160)
         dia = random.randint(70, 100)
         spo2 = random.randint(90, 100)
 
-        prediction = self.model.predict([[hr, sys, dia, spo2]])[0]
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        self.cursor.execute("""
-            INSERT INTO health_logs (timestamp, heart_rate, bp_systolic, bp_diastolic, is_critical)
-            VALUES (?, ?, ?, ?, ?)
-        """, (now, hr, sys, dia, int(prediction)))
-        self.conn.commit()
+        prediction = self.predict_batch([[hr, sys, dia, spo2]], device_ids=[device_id])[0]
         print(f" Health: HR={hr}, BP={sys}/{dia}, Critical={bool(prediction)}")
-        return prediction
\ No newline at end of file
+        return prediction
+
+    def monitor_all(self):
+        # Simulated readings for every resident, scored in one batch
+        n = len(self.residents)
+        readings = np.column_stack([
+            np.random.randint(65, 111, n),
+            np.random.randint(110, 161, n),
+            np.random.randint(70, 101, n),
+            np.random.randint(90, 101, n),
+        ])
+        predictions = self.predict_batch(readings, device_ids=self.residents.ids)
+        critical = [self.residents.ids[slot] for slot in np.flatnonzero(predictions)]
+        print(f" Health: {n} residents checked, {len(critical)} critical")
+        return critical
+
+    def predict_batch(self, readings, timestamps=None, device_ids=None):
+        # readings: (n, 4) array of [hr, sys, dia, spo2] or a DataFrame with VITALS columns;
+        # device_ids defaults to the single-resident DEFAULT_DEVICE. Implausible
+        # values raise ValueError.
+        X = HEALTH_FEATURES.build(readings)
+        if len(X) == 0:
+            return np.zeros(0, dtype=int)
+        if timestamps is None:
+            timestamps = [datetime.now().strftime("%Y-%m-%d %H:%M:%S")] * len(X)
+        if device_ids is None:
+            device_ids = [DEFAULT_DEVICE] * len(X)
+
+        features = X
+        if self.trends is not None:
+            features = np.hstack([X, self.trends.update(device_ids, timestamp_minutes(timestamps), X)])
+        # One model call for the whole batch instead of one per reading
+        predictions = self.model.predict(features).astype(int)
+
+        vitals = X.astype(int).tolist()
+        crits = predictions.tolist()
+        rows = [(ts, hr, sys, dia, crit, device_id)
+                for ts, (hr, sys, dia, _), crit, device_id in zip(timestamps, vitals, crits, device_ids)]
+
+        # Committed with the writer's next group transaction
+        self.writer.executemany(INSERT_LOG, rows)
+        self._remember(device_ids, vitals, crits)
+        return predictions
+
+    def _remember(self, device_ids, vitals, crits):
+        now = time.time()
+        residents = self.residents
+        add = residents.add
+        hr_col, sys_col, dia_col, spo2_col, crit_col, seen_col = (
+            residents.columns[f] for f in ("heart_rate", "bp_systolic", "bp_diastolic", "spo2", "critical", "last_reading"))
+        for device_id, (hr, sys, dia, spo2), crit in zip(device_ids, vitals, crits):
+            slot = add(device_id)
+            hr_col[slot], sys_col[slot], dia_col[slot], spo2_col[slot] = hr, sys, dia, spo2
+            crit_col[slot] = crit
+            seen_col[slot] = now
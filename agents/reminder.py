@@ -1,12 +1,25 @@
-import sqlite3
-from datetime import datetime
+import heapq
+from datetime import datetime, timedelta
+from utils.db import connect
 from utils.tts import speak
 
+def next_occurrence(hhmm, after):
+    # Next datetime strictly after `after` matching a daily "HH:MM" or "HH:MM:SS" time
+    try:
+        parts = [int(p) for p in hhmm.split(":")]
+        due = after.replace(hour=parts[0], minute=parts[1],
+                            second=parts[2] if len(parts) > 2 else 0, microsecond=0)
+    except (ValueError, IndexError, AttributeError):
+        return None
+    if due <= after:
+        due += timedelta(days=1)
+    return due
+
 class ReminderAgent:
     def __init__(self, db_path="db/memory.sqlite"):
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""
+        self.db_path = db_path
+        conn = connect(db_path)
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS reminders (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 time TEXT,
@@ -14,12 +27,70 @@ class ReminderAgent:
                 language TEXT
             )
         """)
-        self.conn.commit()
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders (time)")
+        conn.commit()
+
+        # Min-heap of (due, id, time, message, language), one entry per reminder
+        self.schedule = []
+        self.last_id = 0
+        self.last_check = datetime.now()
+        self.sync()
+
+    def sync(self):
+        # Pick up reminders inserted since the last sync; ids only grow so this
+        # is a primary-key range scan over the new rows
+        rows = connect(self.db_path).execute(
+            "SELECT id, time, message, language FROM reminders WHERE id > ? ORDER BY id",
+            (self.last_id,)).fetchall()
+        if not rows:
+            return 0
+        entries = []
+        for rid, hhmm, message, lang in rows:
+            due = next_occurrence(hhmm, self.last_check)
+            if due is not None:
+                entries.append((due, rid, hhmm, message, lang))
+        if len(entries) > len(self.schedule):
+            self.schedule.extend(entries)
+            heapq.heapify(self.schedule)
+        else:
+            for entry in entries:
+                heapq.heappush(self.schedule, entry)
+        self.last_id = rows[-1][0]
+        return len(rows)
+
+    def reload(self):
+        # Rebuild from scratch, e.g. after reminders were edited or deleted
+        self.schedule = []
+        self.last_id = 0
+        return self.sync()
+
+    def add_reminder(self, time, message, language):
+        conn = connect(self.db_path)
+        with conn:
+            conn.execute("INSERT INTO reminders (time, message, language) VALUES (?, ?, ?)",
+                         (time, message, language))
+        self.sync()
+
+    def due_reminders(self, now=None):
+        # Pop everything due since the last check, even if the loop overslept a
+        # minute, and reschedule each for its next daily occurrence
+        now = now or datetime.now()
+        due = []
+        while self.schedule and self.schedule[0][0] <= now:
+            _, rid, hhmm, message, lang = self.schedule[0]
+            heapq.heapreplace(self.schedule, (next_occurrence(hhmm, now), rid, hhmm, message, lang))
+            due.append((message, lang))
+        self.last_check = now
+        return due
+
+    def seconds_until_next(self, now=None):
+        if not self.schedule:
+            return None
+        now = now or datetime.now()
+        return max(0.0, (self.schedule[0][0] - now).total_seconds())
 
     def check_and_remind(self):
-        now = datetime.now().strftime("%H:%M")
-        self.cursor.execute("SELECT message, language FROM reminders WHERE time = ?", (now,))
-        reminders = self.cursor.fetchall()
-        for message, lang in reminders:
+        self.sync()
+        for message, lang in self.due_reminders():
             print(f" Reminder: {message}")
-            speak(message, lang)
\ No newline at end of file
+            speak(message, lang)
@@ -0,0 +1,61 @@
+from array import array
+import numpy as np
+
+DEFAULT_DEVICE = "D1000"
+
+class ResidentTable:
+    # Per-device state for a whole facility, stored column-wise: each device
+    # gets a slot index and every field is one typed array, so a resident
+    # costs a few bytes per field plus its id->slot dict entry, and a tick can
+    # scan a column for all residents at once (see column()).
+    FIELDS = {
+        "last_movement": "d",   # epoch seconds
+        "last_reading": "d",    # epoch seconds
+        "heart_rate": "h",
+        "bp_systolic": "h",
+        "bp_diastolic": "h",
+        "spo2": "h",
+        "critical": "b",
+        "fallen_at": "d",       # epoch seconds of an unresolved fall, 0 when none
+        "fall_impact": "b",     # worst impact of that fall, index into safety.IMPACTS
+        "fall_grade": "b",      # highest alert grade raised for it so far
+    }
+
+    def __init__(self, device_ids=()):
+        self.ids = []
+        self.index = {}
+        self.columns = {name: array(code) for name, code in self.FIELDS.items()}
+        for device_id in device_ids:
+            self.add(device_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, device_id):
+        return device_id in self.index
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def add(self, device_id):
+        slot = self.index.get(device_id)
+        if slot is None:
+            slot = self.index[device_id] = len(self.ids)
+            self.ids.append(device_id)
+            for values in self.columns.values():
+                values.append(0)
+        return slot
+
+    def get(self, device_id, field):
+        return self.columns[field][self.index[device_id]]
+
+    def set(self, device_id, field, value):
+        # Unknown devices are registered on first contact
+        self.columns[field][self.add(device_id)] = value
+
+    def column(self, field):
+        # NumPy snapshot of a field for every resident, in slot order. A copy
+        # rather than a view: a live buffer export would stop add() from
+        # growing the array.
+        values = self.columns[field]
+        return np.array(values, dtype=values.typecode)
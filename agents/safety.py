@@ -1,31 +1,155 @@
-import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
+from agents.residents import DEFAULT_DEVICE, ResidentTable
+from utils.db import add_column, connect, get_writer
+from utils.timer_wheel import TimerWheel
+
+INACTIVITY_LIMIT = 5 * 60  # seconds
+
+# Sensor vocabulary of safety_monitoring.csv
+ACTIVITIES = ("Walking", "Sitting", "Lying", "No Movement")
+IMPACTS = ("Low", "Medium", "High")
+# Activities that show a fallen resident got back up
+RECOVERED = {"Walking", "Sitting"}
+
+# Fall alert grades. An unresolved fall is graded by its impact and by how
+# long the resident has stayed down since, whichever is worse; every rise in
+# grade raises one alert.
+LEVELS = ("", "warning", "critical", "emergency")
+IMPACT_GRADE = {"Low": 0, "Medium": 1, "High": 2}
+ESCALATION = ((60, 1), (180, 2), (300, 3))  # (seconds down, grade)
+
+INSERT_ALERT = "INSERT INTO alerts (timestamp, message, device_id, level) VALUES (?, ?, ?, ?)"
+
+def fall_grade(impact, seconds_down):
+    grade = IMPACT_GRADE[impact]
+    for limit, level in ESCALATION:
+        if seconds_down >= limit:
+            grade = max(grade, level)
+    return grade
 
 class SafetyAgent:
-    def __init__(self, db_path="db/memory.sqlite"):
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""
+    def __init__(self, db_path="db/memory.sqlite", device_ids=(DEFAULT_DEVICE,)):
+        conn = connect(db_path)
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS alerts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT,
                 message TEXT
             )
         """)
-        self.conn.commit()
-        self.last_movement = datetime.now()
+        add_column(conn, "alerts", "device_id", "TEXT")
+        add_column(conn, "alerts", "level", "TEXT")
+        conn.commit()
+        self.writer = get_writer(db_path)
+        self.residents = ResidentTable(device_ids)
+        # One inactivity deadline per device, armed by motion and fired once
+        # per episode; motion may arrive from other threads (IoT ingestion)
+        now = time.time()
+        self.deadlines = TimerWheel(now)
+        # Next escalation of each unresolved fall, and where it happened
+        self.escalations = TimerWheel(now)
+        self.locations = {}
+        self._lock = threading.Lock()
+        for device_id in self.residents:
+            self.simulate_motion(device_id, now)
+
+    def simulate_motion(self, device_id=DEFAULT_DEVICE, now=None):
+        # Record movement and push the device's deadline INACTIVITY_LIMIT out
+        now = time.time() if now is None else now
+        with self._lock:
+            self._moved(self.residents.add(device_id), device_id, now)
+
+    def _moved(self, slot, device_id, now):
+        # Only forward: a late event from a buffering gateway must not pull
+        # the deadline back before motion already seen
+        last_movement = self.residents.columns["last_movement"]
+        if now <= last_movement[slot]:
+            return
+        last_movement[slot] = now
+        self.deadlines.schedule(device_id, now + INACTIVITY_LIMIT)
+
+    def process_events(self, events):
+        # Run sensor events through each resident's fall state machine, in
+        # order. events: (device_id, epoch seconds, activity, fall_detected,
+        # impact, post-fall inactivity seconds, location) tuples. Alerts are
+        # returned as (device_id, level, message) and queued on the writer, so
+        # no event waits on the database.
+        alerts, rows = [], []
+        with self._lock:
+            columns = self.residents.columns
+            fallen_at, impact_col, grade_col = columns["fallen_at"], columns["fall_impact"], columns["fall_grade"]
+            for device_id, now, activity, fall, impact, inactivity, location in events:
+                slot = self.residents.add(device_id)
+                if activity != "No Movement":
+                    self._moved(slot, device_id, now)
+                if fall:
+                    if not fallen_at[slot]:
+                        fallen_at[slot], impact_col[slot], grade_col[slot] = now, 0, 0
+                    impact_col[slot] = max(impact_col[slot], IMPACT_GRADE[impact])
+                    self.locations[device_id] = location
+                elif not fallen_at[slot]:
+                    continue
+                elif activity in RECOVERED:
+                    fallen_at[slot] = 0
+                    self.escalations.cancel(device_id)
+                    continue
+                self._grade(slot, device_id, max(now - fallen_at[slot], inactivity), now, alerts, rows)
+        if rows:
+            self.writer.executemany(INSERT_ALERT, rows)
+        return alerts
+
+    def check_falls(self, now=None):
+        # Escalate falls whose resident has stayed down past the next limit
+        now = time.time() if now is None else now
+        alerts, rows = [], []
+        with self._lock:
+            fallen_at = self.residents.columns["fallen_at"]
+            for device_id in self.escalations.expire(now):
+                slot = self.residents.index[device_id]
+                self._grade(slot, device_id, now - fallen_at[slot], now, alerts, rows)
+        if rows:
+            self.writer.executemany(INSERT_ALERT, rows)
+        return alerts
+
+    def _grade(self, slot, device_id, seconds_down, now, alerts, rows):
+        columns = self.residents.columns
+        impact = IMPACTS[columns["fall_impact"][slot]]
+        grade = fall_grade(impact, seconds_down)
+        if grade > columns["fall_grade"][slot]:
+            columns["fall_grade"][slot] = grade
+            place = self.locations.get(device_id)
+            message = (f"Fall detected{f' in {place}' if place else ''} ({impact.lower()} impact), "
+                       f"down for {int(seconds_down)}s")
+            level = LEVELS[grade]
+            alerts.append((device_id, level, message))
+            rows.append((datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"), message, device_id, level))
+        # Wake up again at the next limit that would raise the grade
+        for limit, level in ESCALATION:
+            if level > columns["fall_grade"][slot] and limit > seconds_down:
+                self.escalations.schedule(device_id, now + limit - seconds_down)
+                break
+        else:
+            self.escalations.cancel(device_id)
 
-    def simulate_motion(self):
-        self.last_movement = datetime.now()
+    def seconds_until_next(self, now=None):
+        # How long the next check can sleep; None when nothing is armed
+        with self._lock:
+            due = [d for d in (self.deadlines.next_deadline(), self.escalations.next_deadline()) if d is not None]
+        if not due:
+            return None
+        return max(0.0, min(due) - (time.time() if now is None else now))
 
-    def check_inactivity(self):
-        now = datetime.now()
-        delta = now - self.last_movement
-        if delta > timedelta(minutes=5):
+    def check_inactivity(self, now=None):
+        # Devices whose deadline passed since the last check. Each is reported
+        # once; it is re-armed by its next motion event.
+        now = time.time() if now is None else now
+        with self._lock:
+            inactive = self.deadlines.expire(now)
+        if inactive:
             message = "Inactivity detected for 5 minutes!"
-            print(f"⚠️ {message}")
-            self.cursor.execute("INSERT INTO alerts (timestamp, message) VALUES (?, ?)",
-                               (now.strftime("%Y-%m-%d %H:%M:%S"), message))
-            self.conn.commit()
-            return True
-        return False
\ No newline at end of file
+            print(f"⚠️ {message} ({len(inactive)} residents)")
+            timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+            self.writer.executemany(INSERT_ALERT, [(timestamp, message, device_id, "warning") for device_id in inactive])
+        return inactive
@@ -1,3 +1,4 @@
+from utils.playback import PRIORITY_SOCIAL
 from utils.tts import speak
 import random
 
@@ -12,4 +13,4 @@ class SocialAgent:
     def cheer_up(self, lang="ta"):
         message = random.choice(self.messages[lang])
         print(f" Social: {message}")
-        speak(message, lang)
\ No newline at end of file
+        speak(message, lang, PRIORITY_SOCIAL)
\ No newline at end of file
@@ -0,0 +1,376 @@
+import codecs
+import json
+import math
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from agents.residents import DEFAULT_DEVICE
+from agents.safety import ACTIVITIES, IMPACTS
+from utils.features import HEALTH_FEATURES
+
+# Payload fields in the order HealthAgent.predict_batch expects them
+FIELDS = tuple(HEALTH_FEATURES.names)
+
+# Loose sanity limits; anything outside is a sensor or client error, not a reading
+LIMITS = {f.name: (f.low, f.high) for f in HEALTH_FEATURES.features}
+
+# How timestamps are stored in health_logs (and compared by history queries)
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(value):
+    # ISO 8601 string or epoch seconds -> TIME_FORMAT string in local time;
+    # missing means now
+    if value is None or value == "":
+        return datetime.now().strftime(TIME_FORMAT)
+    try:
+        if isinstance(value, str):
+            moment = datetime.fromisoformat(value)
+            if moment.tzinfo is not None:
+                moment = moment.astimezone().replace(tzinfo=None)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            moment = datetime.fromtimestamp(value)
+        else:
+            raise TypeError
+        return moment.strftime(TIME_FORMAT)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("timestamp must be an ISO 8601 string or epoch seconds")
+
+
+def parse_reading(data):
+    # Validate one IoT payload and return (hr, sys, dia, spo2, timestamp, device_id)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    values = []
+    for field in FIELDS:
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{field} must be a number")
+        low, high = LIMITS[field]
+        if not low <= value <= high:
+            raise ValueError(f"{field}={value} outside {low}-{high}")
+        values.append(value)
+    timestamp = parse_timestamp(data.get("timestamp"))
+    device_id = data.get("device_id", DEFAULT_DEVICE)
+    if not isinstance(device_id, str) or not device_id:
+        raise ValueError("device_id must be a non-empty string")
+    return (*values, timestamp, device_id)
+
+
+def parse_safety_event(data):
+    # Validate one safety sensor payload and return the event tuple
+    # SafetyAgent.process_events takes: (device_id, epoch seconds, activity,
+    # fall_detected, impact, post-fall inactivity seconds, location)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    device_id = data.get("device_id", DEFAULT_DEVICE)
+    if not isinstance(device_id, str) or not device_id:
+        raise ValueError("device_id must be a non-empty string")
+    activity = data.get("activity")
+    if activity not in ACTIVITIES:
+        raise ValueError(f"activity must be one of {', '.join(ACTIVITIES)}")
+    fall = data.get("fall_detected", False)
+    if not isinstance(fall, bool):
+        raise ValueError("fall_detected must be true or false")
+    impact = data.get("impact") if fall else None
+    if fall and impact not in IMPACTS:
+        raise ValueError(f"impact must be one of {', '.join(IMPACTS)} when a fall is detected")
+    inactivity = data.get("post_fall_inactivity", 0)
+    if (isinstance(inactivity, bool) or not isinstance(inactivity, (int, float))
+            or not math.isfinite(inactivity) or inactivity < 0):
+        raise ValueError("post_fall_inactivity must be a non-negative number of seconds")
+    location = data.get("location")
+    if location is not None and not isinstance(location, str):
+        raise ValueError("location must be a string")
+    timestamp = data.get("timestamp")
+    if timestamp is None:
+        timestamp = time.time()
+    else:
+        try:
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp).timestamp()
+            elif isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)):
+                raise TypeError
+            # Alerts are stamped with it, so it must be a time datetime can hold
+            if not math.isfinite(timestamp):
+                raise ValueError
+            datetime.fromtimestamp(timestamp)
+        except (TypeError, ValueError, OverflowError, OSError):
+            raise ValueError("timestamp must be ISO 8601 or epoch seconds")
+    return device_id, float(timestamp), activity, fall, impact, float(inactivity), location
+
+
+class HealthIngestQueue:
+    # Collects readings from request threads and scores/persists them in batches
+    # from a single worker, flushing every max_delay seconds or max_batch readings.
+    def __init__(self, agent, max_batch=1000, max_delay=0.05, max_queue=100_000):
+        self.agent = agent
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"queued": 0, "rejected": 0, "processed": 0, "critical": 0, "batches": 0, "errors": 0}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="health-ingest", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def put(self, reading):
+        # Never block a request thread; a full queue means the caller should back off
+        try:
+            self.queue.put_nowait(reading)
+        except queue.Full:
+            self.stats["rejected"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [r for r in batch if r is not None]
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        readings = np.array([r[:4] for r in batch], dtype=HEALTH_FEATURES.dtype)
+        timestamps = [r[4] for r in batch]
+        device_ids = [r[5] for r in batch]
+        try:
+            predictions = self.agent.predict_batch(readings, timestamps, device_ids)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Health ingest failed for {len(batch)} readings: {e}")
+            return
+        critical = int(predictions.sum())
+        self.stats["processed"] += len(batch)
+        self.stats["critical"] += critical
+        self.stats["batches"] += 1
+        if critical:
+            print(f"⚠️ IoT Health: {critical} critical readings in batch of {len(batch)}")
+
+
+class SafetyClock:
+    # Background thread that fires the safety agent's timers (fall escalation,
+    # inactivity) between events, sleeping until the next one is due
+    def __init__(self, agent, max_sleep=1.0):
+        self.agent = agent
+        self.max_sleep = max_sleep
+        self.stats = {"escalations": 0, "inactive": 0, "errors": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="safety-clock", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                for device_id, level, message in self.agent.check_falls():
+                    print(f"🚨 IoT Safety [{level}] {device_id}: {message}")
+                    self.stats["escalations"] += 1
+                self.stats["inactive"] += len(self.agent.check_inactivity())
+                wait = self.agent.seconds_until_next()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Safety clock failed: {e}")
+                wait = None
+            self._stop.wait(self.max_sleep if wait is None else min(wait, self.max_sleep))
+
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD = 1024 * 1024  # characters one array element may take
+_decoder = json.JSONDecoder()
+# Characters that matter when looking for the end of an array element
+_STRUCTURE = re.compile(r'[\\"\[\]{},]')
+
+
+def iter_ndjson(stream):
+    # One JSON object per line; a bad line yields an error instead of aborting the batch
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as e:
+            yield None, f"invalid JSON: {e}"
+
+
+def _element_end(buf, pos, state):
+    # Index of the top-level "," or "]" that ends the array element starting at
+    # pos, or -1 if buf runs out first. state = [depth, in_string] carries the
+    # scan across chunks.
+    depth, in_string = state
+    while True:
+        match = _STRUCTURE.search(buf, pos)
+        if match is None:
+            state[:] = depth, in_string
+            return -1
+        c, pos = match.group(), match.end()
+        if in_string:
+            if c == "\\":
+                pos += 1  # the escaped character, whatever it is
+                if pos > len(buf):
+                    # Escape split across chunks: the next chunk's first character is escaped
+                    state[:] = depth, in_string
+                    return -2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "[{":
+            depth += 1
+        elif c in "]}" and depth:
+            depth -= 1
+        elif c in ",]" and not depth:
+            return match.start()
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE, max_record=MAX_RECORD):
+    # Incrementally decode a top-level JSON array, holding at most one chunk
+    # plus the record currently being parsed (up to max_record characters) in
+    # memory. A malformed or oversized element yields an error for that
+    # element only and parsing resumes at the next one. Raises ValueError if
+    # the body is not an array at all.
+    decode = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, started, eof = "", 0, False, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + decode.decode(chunk or b"", final=eof)
+        pos = 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                if not started:
+                    raise ValueError("expected a JSON array")
+                yield None, "unexpected end of JSON array"
+                return
+            fill()
+            continue
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            record, end = _decoder.raw_decode(buf, pos)
+            after = end
+            while after < len(buf) and buf[after] in " \t\r\n":
+                after += 1
+            if after < len(buf) and buf[after] not in ",]":
+                # Trailing junk ("1x"), or a number the chunk cut short ("1." of "1.5")
+                raise ValueError("element not followed by , or ]")
+        except ValueError:
+            state = [0, False]
+            end = _element_end(buf, pos, state)
+            if end >= 0:
+                # The whole element is buffered and still does not parse
+                yield None, "invalid JSON record"
+                pos = end
+                continue
+            if eof:
+                yield None, "unexpected end of JSON array"
+                return
+            if len(buf) - pos <= max_record:
+                # Most likely the record straddles the chunk boundary
+                fill()
+                continue
+            # Too big to be a reading: drop it chunk by chunk up to its end
+            yield None, f"record longer than {max_record} characters"
+            while end < 0:
+                skip = 1 if end == -2 else 0
+                pos = len(buf)
+                fill()
+                if eof and not buf:
+                    yield None, "unexpected end of JSON array"
+                    return
+                end = _element_end(buf, skip, state)
+            pos = end
+            continue
+        if after == len(buf) and not eof:
+            # Nothing follows yet and a number may go on in the next chunk
+            # ("1" of "18"); decode again once more of the body is in
+            fill()
+            continue
+        pos = end
+        yield record, None
+
+
+def enqueue_records(records, ingest):
+    # Validate and enqueue each (record, parse_error) pair, returning per-record status
+    results = []
+    append = results.append
+    for record, error in records:
+        if error is None:
+            try:
+                reading = parse_reading(record)
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            append({"status": "invalid", "error": error})
+        elif ingest.put(reading):
+            append({"status": "received"})
+        else:
+            append({"status": "busy"})
+    return results
+
+
+def process_safety_records(records, agent):
+    # Validate (record, parse_error) pairs and run the valid events through the
+    # safety agent as one batch; returns per-record status and raised alerts
+    events, results = [], []
+    for record, error in records:
+        if error is None:
+            try:
+                events.append(parse_safety_event(record))
+            except ValueError as e:
+                error = str(e)
+        results.append({"status": "invalid", "error": error} if error is not None else {"status": "received"})
+    alerts = agent.process_events(events) if events else []
+    return results, alerts
@@ -1,18 +1,75 @@
 from flask import Flask, request
 from agents.health import HealthAgent
+from agents.safety import SafetyAgent
+from api.ingest import (HealthIngestQueue, SafetyClock, enqueue_records, iter_json_array, iter_ndjson,
+                        parse_reading, parse_safety_event, process_safety_records)
 
 app = Flask(__name__)
 health_agent = HealthAgent()
+health_ingest = HealthIngestQueue(health_agent).start()
+# Residents are tracked from their first safety event on
+safety_agent = SafetyAgent(device_ids=())
+safety_clock = SafetyClock(safety_agent).start()
 
 @app.route('/iot/health', methods=['POST'])
 def receive_health():
-    data = request.json
-    hr = data.get("heart_rate")
-    sys = data.get("bp_systolic")
-    dia = data.get("bp_diastolic")
-    print(f"📡 IoT Data: HR={hr}, BP={sys}/{dia}")
-    # Future: health_agent.monitor_health_from_iot(hr, sys, dia)
+    try:
+        reading = parse_reading(request.get_json(silent=True))
+    except ValueError as e:
+        return {"status": "invalid", "error": str(e)}, 400
+    if not health_ingest.put(reading):
+        return {"status": "busy"}, 503
     return {"status": "received"}, 200
 
+@app.route('/iot/health/batch', methods=['POST'])
+def receive_health_batch():
+    # Gateways flush buffered readings as a JSON array or an NDJSON stream
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        records = iter_ndjson(request.stream)
+    else:
+        records = iter_json_array(request.stream)
+    try:
+        results = enqueue_records(records, health_ingest)
+    except ValueError as e:
+        return {"status": "invalid", "error": str(e)}, 400
+    received = sum(1 for r in results if r["status"] == "received")
+    return {"received": received, "rejected": len(results) - received, "results": results}, 200
+
+@app.route('/iot/health/stats', methods=['GET'])
+def health_stats():
+    return {**health_ingest.stats, "pending": health_ingest.queue.qsize()}, 200
+
+def _alerts(alerts):
+    return [{"device_id": device_id, "level": level, "message": message} for device_id, level, message in alerts]
+
+@app.route('/iot/safety', methods=['POST'])
+def receive_safety():
+    # Scored inline: the fall state machine is in memory and alerts are
+    # written by the group-commit writer, so the response carries any alert
+    try:
+        event = parse_safety_event(request.get_json(silent=True))
+    except ValueError as e:
+        return {"status": "invalid", "error": str(e)}, 400
+    return {"status": "received", "alerts": _alerts(safety_agent.process_events([event]))}, 200
+
+@app.route('/iot/safety/batch', methods=['POST'])
+def receive_safety_batch():
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        records = iter_ndjson(request.stream)
+    else:
+        records = iter_json_array(request.stream)
+    try:
+        results, alerts = process_safety_records(records, safety_agent)
+    except ValueError as e:
+        return {"status": "invalid", "error": str(e)}, 400
+    received = sum(1 for r in results if r["status"] == "received")
+    return {"received": received, "rejected": len(results) - received, "results": results,
+            "alerts": _alerts(alerts)}, 200
+
+@app.route('/iot/safety/stats', methods=['GET'])
+def safety_stats():
+    return {**safety_clock.stats, "residents": len(safety_agent.residents)}, 200
+
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Threaded server without the debug reloader so the ingest worker runs once
+    app.run(port=5000, threaded=True)
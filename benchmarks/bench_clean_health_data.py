@@ -0,0 +1,97 @@
+# Equivalence check and benchmark for the vectorized clean_health_data against
+# the original per-row .apply() implementation (kept below as the reference).
+# Run from the repo root: python -m benchmarks.bench_clean_health_data
+import time
+
+import numpy as np
+import pandas as pd
+
+from train_health_model import clean_health_data
+
+ROWS = 1_000_000
+
+
+def legacy_clean_health_data(df):
+    df = df.fillna({
+        'Heart Rate': '0 Yes',
+        'Glucose Levels': '0 Yes',
+        'Blood Pressure': '0/0',
+        'Oxygen Saturation (SpO₂%)': '0 No',
+        'Alert Triggered (Yes/No)': 'No',
+        'Caregiver Notified (Yes/No)': 'No'
+    })
+    df['Heart Rate'] = df['Heart Rate'].astype(str).apply(
+        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
+    )
+    df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(
+        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
+    )
+    df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(
+        lambda x: x.split('/')[0] if '/' in x else '0'
+    ).astype(float)
+    df['Oxygen Saturation (SpO₂%)'] = df['Oxygen Saturation (SpO₂%)'].astype(str).apply(
+        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
+    )
+    df['Timestamp'] = pd.to_datetime(
+        df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0],
+        errors='coerce'
+    )
+    df['Heart Rate'] = df['Heart Rate'].apply(lambda x: x if 30 <= x <= 200 else 60.0)
+    df['Glucose Levels'] = df['Glucose Levels'].apply(lambda x: x if 50 <= x <= 400 else 100.0)
+    return df
+
+
+def assert_equivalent(raw):
+    expected = legacy_clean_health_data(raw.copy())
+    actual = clean_health_data(raw.copy())
+    assert 'Blood Pressure (Diastolic)' in actual
+    pd.testing.assert_frame_equal(actual.drop(columns=['Blood Pressure (Diastolic)']), expected,
+                                  check_dtype=False)
+    return actual
+
+
+def messy_frame():
+    # Strings and numbers of every shape the per-row parser had to cope with
+    values = ["72", "72 bpm", " 98.5 %", "12.", ".5", "-5", "1e3", "abc", "", "0 Yes", "72\tbpm",
+              "72\n", "5 . 6", "1.2.3", np.nan, "250", "29.9", "401 mg"]
+    n = len(values)
+    return pd.DataFrame({
+        'Device-ID/User-ID': [f"D{i}" for i in range(n)],
+        'Timestamp': ["1/22/2025 20:42"] * (n - 1) + ["bad"],
+        'Heart Rate': pd.Series(values, dtype=object),
+        'Glucose Levels': pd.Series(values[::-1], dtype=object),
+        'Blood Pressure': pd.Series(["136/79 mmHg", "120/ 80", "140", "", "9/x", np.nan]
+                                    * 3, dtype=object),
+        'Oxygen Saturation (SpO₂%)': pd.Series(values, dtype=object),
+        'Alert Triggered (Yes/No)': ["Yes"] * n,
+        'Caregiver Notified (Yes/No)': [np.nan] + ["No"] * (n - 1),
+    })
+
+
+def main():
+    raw = pd.read_csv('health_monitoring.csv')
+    cleaned = assert_equivalent(raw)
+    assert_equivalent(messy_frame())
+    floats = raw.astype({'Heart Rate': float, 'Oxygen Saturation (SpO₂%)': float})
+    floats.loc[:5, 'Heart Rate'] = [np.nan, -3.0, 1e-5, 1e17, np.inf, 72.5]
+    assert_equivalent(floats)
+    diastolic = cleaned['Blood Pressure (Diastolic)']
+    print(f"equivalent on health_monitoring.csv and edge cases; diastolic {diastolic.min():.0f}-{diastolic.max():.0f}")
+
+    big = pd.concat([raw] * (ROWS // len(raw)), ignore_index=True)
+    # Spread readings over a year at minute resolution so timestamps are mostly
+    # distinct, as in a real multi-device export
+    rng = np.random.default_rng(0)
+    minutes = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, len(big)), unit="min")
+    big['Timestamp'] = (minutes.month.astype(str) + "/" + minutes.day.astype(str) + "/" + minutes.year.astype(str)
+                        + " " + minutes.hour.astype(str) + ":" + minutes.strftime("%M"))
+    print(f"{big['Timestamp'].nunique():,} distinct timestamps, {big['Blood Pressure'].nunique():,} distinct BP strings")
+    for name, func in (("per-row apply", legacy_clean_health_data), ("vectorized", clean_health_data)):
+        start = time.perf_counter()
+        func(big.copy())
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14} {len(big):,} rows in {elapsed:6.2f}s ({len(big) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Concurrent agent inserts/sec: a private connection with commit-per-insert per
+# agent (the old pattern) vs the shared group-commit writer in utils.db.
+# Run from the repo root: python -m benchmarks.bench_db_writes
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.db import GroupCommitWriter
+
+INSERTS_PER_AGENT = 2000
+
+SCHEMA = """
+    CREATE TABLE health_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, heart_rate INTEGER,
+                              bp_systolic INTEGER, bp_diastolic INTEGER, is_critical INTEGER);
+    CREATE TABLE alerts (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, message TEXT);
+    CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, time TEXT, message TEXT, language TEXT);
+"""
+
+# One insert shape per writing agent (health, safety, family, reminder setup)
+AGENT_INSERTS = {
+    "health": ("INSERT INTO health_logs (timestamp, heart_rate, bp_systolic, bp_diastolic, is_critical) "
+               "VALUES (?, ?, ?, ?, ?)", ("2025-01-01 00:00:00", 80, 120, 80, 0)),
+    "safety": ("INSERT INTO alerts (timestamp, message) VALUES (?, ?)",
+               ("2025-01-01 00:00:00", "Inactivity detected for 5 minutes!")),
+    "family": ("INSERT INTO alerts (timestamp, message) VALUES (?, ?)",
+               ("2025-01-01 00:00:00", "Critical health condition detected!")),
+    "reminder": ("INSERT INTO reminders (time, message, language) VALUES (?, ?, ?)",
+                 ("14:30", "Take your medicine", "en")),
+}
+
+
+def fresh_db(tmp, name):
+    path = os.path.join(tmp, name)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+def run_threads(target):
+    threads = [threading.Thread(target=target, args=(sql, params)) for sql, params in AGENT_INSERTS.values()]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def before(path):
+    locked = []
+
+    def agent(sql, params):
+        conn = sqlite3.connect(path)
+        for _ in range(INSERTS_PER_AGENT):
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+            except sqlite3.OperationalError:
+                locked.append(1)
+        conn.close()
+
+    return run_threads(agent), len(locked)
+
+
+def after(path):
+    writer = GroupCommitWriter(path)
+
+    def agent(sql, params):
+        for _ in range(INSERTS_PER_AGENT):
+            writer.execute(sql, params)
+
+    start = time.perf_counter()
+    run_threads(agent)
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return elapsed, writer.stats["errors"]
+
+
+def main():
+    total = INSERTS_PER_AGENT * len(AGENT_INSERTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, run in (("per-agent commit", before), ("group commit", after)):
+            elapsed, failed = run(fresh_db(tmp, name.replace(" ", "_") + ".sqlite"))
+            print(f"{name:<17} {total} inserts from {len(AGENT_INSERTS)} agents: "
+                  f"{elapsed:6.2f}s {total / elapsed:>10,.0f} inserts/s, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
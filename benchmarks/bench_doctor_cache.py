@@ -0,0 +1,47 @@
+# Alert storms across many residents: how many consultations reach the model
+# with the reply cache and single-flight coalescing in DoctorAgent.
+# Run from the repo root: python -m benchmarks.bench_doctor_cache
+import contextlib
+import io
+import random
+import threading
+import time
+
+from agents.doctor import DoctorAgent
+from benchmarks.ollama_stub import start_stub
+from utils import tts
+from utils.playback import NullBackend
+
+RESIDENTS = 50
+TICKS = 5
+PROMPTS = ["Critical vitals detected. What to do?", "Patient inactive for 5 minutes. Advice?"]
+
+
+def storm(doctor):
+    # Every tick, each resident raises one of the fixed alerts at about the same time
+    for _ in range(TICKS):
+        threads = [threading.Thread(target=doctor.consult, args=(random.choice(PROMPTS), "ta"))
+                   for _ in range(RESIDENTS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+def main():
+    tts.set_backend(NullBackend(), synthesize=lambda text, lang: None)
+    stub = start_stub(delay=0.2, token_interval=0.005)
+    for name, ttl in (("coalescing only", 0), ("cache + coalescing", 600)):
+        before = stub.requests
+        doctor = DoctorAgent(stub.url, cache_ttl=ttl)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            storm(doctor)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<19} {RESIDENTS * TICKS} consultations -> {stub.requests - before:>3} model requests, "
+              f"{elapsed:5.1f}s, hit rate {doctor.cache_hit_rate():.0%} {doctor.cache_stats}")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
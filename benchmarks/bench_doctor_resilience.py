@@ -0,0 +1,56 @@
+# DoctorAgent against a local Ollama stub: connection reuse, behaviour when the
+# backend hangs or errors, and how fast the circuit breaker answers once open.
+# Run from the repo root: python -m benchmarks.bench_doctor_resilience
+import contextlib
+import io
+import time
+
+import requests
+
+from agents.doctor import FALLBACK, DoctorAgent
+from benchmarks.ollama_stub import start_stub
+from utils import tts
+from utils.playback import NullBackend
+
+CALLS = 200
+
+
+def timed(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    tts.set_backend(NullBackend(), synthesize=lambda text, lang: None)
+    stub = start_stub(token_interval=0)
+
+    fresh, _ = timed(lambda: [requests.post(stub.url, json={"prompt": "x", "stream": False}).json()
+                              for _ in range(CALLS)])
+    doctor = DoctorAgent(stub.url, stream=False, cache_ttl=0)
+    pooled, _ = timed(lambda: [doctor.consult("Critical vitals detected. What to do?") for _ in range(CALLS)])
+    print(f"healthy:       fresh connection {fresh / CALLS:.2f} ms/call, pooled session {pooled / CALLS:.2f} ms/call")
+
+    stub.mode = "hang"
+    doctor = DoctorAgent(stub.url, read_timeout=0.5, retries=1, backoff=0.1)
+    ms, reply = timed(lambda: doctor.consult("Critical vitals detected. What to do?"))
+    print(f"hung backend:  fallback after {ms:.0f} ms (read timeout 0.5s, 1 retry) -> {reply == FALLBACK}")
+
+    stub.mode = "error"
+    doctor = DoctorAgent(stub.url, retries=1, backoff=0.05)
+    for _ in range(doctor.breaker.threshold):
+        timed(lambda: doctor.consult("Critical vitals detected. What to do?"))
+    before = stub.requests
+    ms, reply = timed(lambda: doctor.consult("Critical vitals detected. What to do?"))
+    print(f"breaker open:  fallback in {ms:.2f} ms, {stub.requests - before} requests sent -> {reply == FALLBACK}")
+
+    stub.mode = "ok"
+    doctor.breaker.opened_at -= doctor.breaker.reset_after
+    ms, reply = timed(lambda: doctor.consult("Critical vitals detected. What to do?"))
+    print(f"recovered:     trial call {ms:.1f} ms -> {reply != FALLBACK}, breaker closed: {doctor.breaker.opened_at is None}")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Time-to-first-token and time-to-first-audio for DoctorAgent with and without
+# streaming, against the local Ollama stub (no real model or TTS needed).
+# Run from the repo root: python -m benchmarks.bench_doctor_stream
+import contextlib
+import io
+import time
+
+from agents.doctor import DoctorAgent
+from benchmarks.ollama_stub import start_stub
+from utils import tts
+from utils.playback import RecordingBackend
+
+RUNS = 5
+SYNTH_SECONDS = 0.05    # stand-in for a cached-miss synthesis per utterance
+
+
+def synthesize(text, lang):
+    time.sleep(SYNTH_SECONDS)
+    return f"{lang}:{text}"
+
+
+def measure(doctor, recorder):
+    first_token, first_audio, total = [], [], []
+    for _ in range(RUNS):
+        recorder.played.clear()
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            doctor.consult("Critical vitals detected. What to do?", "en")
+        tts.get_queue().wait_idle(30)
+        first_token.append(doctor.last_timing["first_token"])
+        first_audio.append(recorder.played[0][0] - start)
+        total.append(doctor.last_timing["total"])
+    return [sum(v) / RUNS * 1000 for v in (first_token, first_audio, total)]
+
+
+def main():
+    recorder = RecordingBackend(duration=0.0)
+    tts.set_backend(recorder, synthesize=synthesize)
+    # 300 ms before the first token, then ~25 tokens/sec like a small local model
+    stub = start_stub(delay=0.3, token_interval=0.04)
+
+    print(f"{'mode':<10} {'first token':>12} {'first audio':>12} {'full reply':>12}")
+    for name, stream in (("blocking", False), ("streaming", True)):
+        ttft, ttfa, total = measure(DoctorAgent(stub.url, stream=stream, cache_ttl=0), recorder)
+        print(f"{name:<10} {ttft:>10.0f}ms {ttfa:>10.0f}ms {total:>10.0f}ms")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
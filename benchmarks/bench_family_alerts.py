@@ -0,0 +1,75 @@
+# Alert volume under sustained conditions: a facility's health and safety
+# ticks report every resident in a bad state once a minute for a simulated
+# day. Compares rows written by FamilyAgent's incident coalescing with the
+# old one-row-per-report behaviour, and the cost of one report.
+# Run from the repo root: python -m benchmarks.bench_family_alerts
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from agents.family import FamilyAgent
+
+RESIDENTS = 10_000
+MINUTES = 24 * 60
+CHRONIC = 0.02    # residents whose condition never clears
+FLAPPING = 0.05   # residents whose condition comes and goes
+P_ON, P_OFF = 0.02, 0.1  # per-minute chance a flapping condition starts / clears
+
+
+def main():
+    rng = np.random.default_rng(0)
+    kind = rng.random(RESIDENTS)
+    chronic = np.flatnonzero(kind < CHRONIC)
+    flapping = np.flatnonzero((kind >= CHRONIC) & (kind < CHRONIC + FLAPPING))
+    active = np.zeros(len(flapping), dtype=bool)
+    ids = [f"D{1000 + i}" for i in range(RESIDENTS)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        family = FamilyAgent(path)
+        clock = time.time()
+        reports = 0
+        chronic_reports = 0
+        elapsed = 0.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for minute in range(MINUTES):
+                now = clock + 60 * minute
+                flip = rng.random(len(flapping))
+                active = np.where(active, flip >= P_OFF, flip < P_ON)
+                due = np.concatenate([chronic, flapping[active]])
+                start = time.perf_counter()
+                for slot in due.tolist():
+                    family.send_alert("Critical health condition detected!", ids[slot], "critical_vitals", now)
+                family.close_incidents(now)
+                elapsed += time.perf_counter() - start
+                reports += len(due)
+                chronic_reports += len(chronic)
+            family.close_incidents(clock + 60 * MINUTES + 3600)
+        family.writer.flush()
+        conn = sqlite3.connect(path)
+        alerts = conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+        incidents = conn.execute("SELECT COUNT(*), SUM(count), MAX(count) FROM incidents").fetchone()
+        per_device = dict(conn.execute("SELECT device_id, COUNT(*) FROM alerts GROUP BY device_id").fetchall())
+        chronic_alerts = sum(per_device.get(ids[slot], 0) for slot in chronic.tolist())
+        family.writer.close()
+
+    writes = family.stats["notified"] * 2 + family.stats["closed"]
+    print(f"residents:        {RESIDENTS} ({len(chronic)} chronic, {len(flapping)} flapping), {MINUTES} one-minute ticks")
+    print(f"reports:          {reports}")
+    print(f"old behaviour:    {reports} alert rows, {reports} caregiver messages")
+    print(f"incidents:        {incidents[0]} rows covering {incidents[1]} reports (largest {incidents[2]})")
+    print(f"notifications:    {family.stats['notified']} ({alerts} alert rows), "
+          f"{family.stats['suppressed']} suppressed")
+    print(f"rows written:     {writes} ({reports / writes:.0f}x fewer)")
+    print(f"chronic only:     {chronic_reports} reports -> {chronic_alerts} alert rows "
+          f"({chronic_reports / chronic_alerts:.0f}x fewer)")
+    print(f"per report:       {elapsed / reports * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
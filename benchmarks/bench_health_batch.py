@@ -0,0 +1,64 @@
+# Per-row vs batched HealthAgent inference throughput.
+# Run from the repo root: python -m benchmarks.bench_health_batch
+import os
+import sqlite3
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from agents.health import HealthAgent, INSERT_LOG
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def random_readings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(65, 111, n),
+        rng.integers(110, 161, n),
+        rng.integers(70, 101, n),
+        rng.integers(90, 101, n),
+    ])
+
+
+def per_row(agent, conn, readings):
+    # One model call and one commit per reading
+    for hr, sys, dia, spo2 in readings.tolist():
+        prediction = agent.model.predict([[hr, sys, dia, spo2]])[0]
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.execute(INSERT_LOG, (now, hr, sys, dia, int(prediction), "D1000"))
+        conn.commit()
+
+
+def batched(agent, readings):
+    agent.predict_batch(readings)
+    agent.writer.flush()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite")
+        agent = HealthAgent(db_path=db_path)
+        conn = sqlite3.connect(db_path)
+        print(f"{'rows':>6} {'per-row/s':>12} {'batched/s':>12} {'speedup':>8}")
+        for n in (1, 100, 10_000):
+            readings = random_readings(n)
+            # Per-row at 10k takes minutes; time a sample and extrapolate the rate
+            sample = readings[:min(n, 500)]
+            start = time.perf_counter()
+            per_row(agent, conn, sample)
+            row_rate = len(sample) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batched(agent, readings)
+            batch_rate = n / (time.perf_counter() - start)
+            print(f"{n:>6} {row_rate:>12,.0f} {batch_rate:>12,.0f} {batch_rate / row_rate:>7.1f}x")
+        conn.close()
+        agent.writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# health_logs history queries with and without rollups: a week of one
+# reading per minute from 200 residents (2M rows). Times the initial and
+# incremental rollup, summary and chart queries against the old unindexed
+# scan, checks the rollup answers match the raw rows, and prunes.
+# Run from the repo root: python -m benchmarks.bench_health_rollups
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.db import connect
+from utils.rollups import HealthRollups, RETENTION
+
+DEVICES = 200
+DAYS = 7
+START = datetime(2025, 1, 1)
+
+CREATE = """
+    CREATE TABLE health_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, heart_rate INTEGER,
+                              bp_systolic INTEGER, bp_diastolic INTEGER, is_critical INTEGER, device_id TEXT)
+"""
+INSERT = ("INSERT INTO health_logs (timestamp, heart_rate, bp_systolic, bp_diastolic, is_critical, device_id) "
+          "VALUES (?, ?, ?, ?, ?, ?)")
+
+
+def rows(rng, minutes, offset):
+    for m in range(offset, offset + minutes):
+        ts = (START + timedelta(minutes=m, seconds=int(rng.integers(60)))).strftime("%Y-%m-%d %H:%M:%S")
+        hr = rng.integers(60, 120, DEVICES).tolist()
+        sys_ = rng.integers(100, 170, DEVICES).tolist()
+        dia = rng.integers(60, 100, DEVICES).tolist()
+        for d in range(DEVICES):
+            yield ts, hr[d], sys_[d], dia[d], int(hr[d] > 115), f"D{1000 + d}"
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute(CREATE)
+        conn.executemany(INSERT, rows(rng, DAYS * 24 * 60 - 60, 0))
+        conn.commit()
+        n = conn.execute("SELECT COUNT(*) FROM health_logs").fetchone()[0]
+
+        device, start, end = "D1042", "2025-01-02 06:30:15", "2025-01-06 18:45:40"
+        old_sql = ("SELECT COUNT(*), SUM(is_critical), MIN(heart_rate), AVG(heart_rate), MAX(heart_rate) "
+                   "FROM health_logs WHERE device_id = ? AND timestamp >= ? AND timestamp < ?")
+        scan, expected = timed(lambda: conn.execute(old_sql, (device, start, end)).fetchone(), 3)
+        conn.execute("CREATE INDEX idx_health_logs_device_time ON health_logs (device_id, timestamp)")
+        indexed, _ = timed(lambda: conn.execute(old_sql, (device, start, end)).fetchone(), 3)
+
+        rollups = HealthRollups(path)
+        initial, folded = timed(rollups.update)
+        # One more hour of readings arrives; only it is folded in
+        conn.executemany(INSERT, rows(rng, 60, DAYS * 24 * 60 - 60))
+        conn.commit()
+        incremental, added = timed(rollups.update)
+
+        summary_time, summary = timed(lambda: rollups.summary(device, start, end), 20)
+        now = START + timedelta(days=DAYS)
+        chart = {}
+        for label, step in (("daily", None), ("hourly", 3600), ("per minute", 60)):
+            chart[label] = timed(lambda: rollups.series(device, start, end, step, now=now), 5)
+
+        again = conn.execute(old_sql, (device, start, end)).fetchone()
+        got = summary
+        assert (got["n"], got["critical"], got["heart_rate"][0], got["heart_rate"][2]) == \
+               (again[0], again[1], again[2], again[4]), (got, again)
+        assert abs(got["heart_rate"][1] - again[3]) < 1e-9
+
+        prune_at = START + timedelta(days=RETENTION["raw"] + 3)
+        prune_time, deleted = timed(lambda: rollups.prune(now=prune_at))
+        left = connect(path).execute("SELECT COUNT(*) FROM health_logs").fetchone()[0]
+        after = rollups.summary(device, "2025-01-01", "2025-01-08")
+        conn.close()
+
+    print(f"raw rows:            {n} ({DEVICES} residents, {DAYS} days, one reading per minute)")
+    print(f"summary, old scan:   {scan * 1000:.1f} ms (no index)")
+    print(f"summary, indexed:    {indexed * 1000:.2f} ms (device_id, timestamp index on raw rows)")
+    print(f"summary, rollups:    {summary_time * 1000:.2f} ms (matches the raw rows)")
+    for label, (elapsed, (level, points)) in chart.items():
+        print(f"series {label:<11}  {elapsed * 1000:.2f} ms, {len(points)} points from {level or 'raw'}")
+    print(f"initial rollup:      {initial:.1f} s for {folded} rows")
+    print(f"incremental rollup:  {incremental * 1000:.0f} ms for {added} new rows")
+    print(f"prune after {RETENTION['raw'] + 3} days: {prune_time:.2f} s, deleted {deleted}, {left} raw rows left, "
+          f"week summary still n={after['n']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Parse + validate + enqueue throughput for the /iot/health/batch body formats.
+# Run from the repo root: python -m benchmarks.bench_iot_batch
+import io
+import json
+import random
+import time
+
+from api.ingest import HealthIngestQueue, enqueue_records, iter_json_array, iter_ndjson
+
+N = 200_000
+
+
+def make_records(n, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "device_id": f"D{1000 + rng.randrange(10_000)}",
+        "heart_rate": rng.randint(65, 110),
+        "bp_systolic": rng.randint(110, 160),
+        "bp_diastolic": rng.randint(70, 100),
+        "spo2": rng.randint(90, 100),
+        "timestamp": "2025-01-22 20:42:00",
+    } for _ in range(n)]
+
+
+def run(name, body, parse):
+    # Worker not started: this measures the request-thread side only
+    ingest = HealthIngestQueue(agent=None, max_queue=N + 1)
+    start = time.perf_counter()
+    results = enqueue_records(parse(io.BytesIO(body)), ingest)
+    elapsed = time.perf_counter() - start
+    assert ingest.stats["queued"] == N, ingest.stats
+    print(f"{name:<11} {len(results):>8} records {elapsed:6.2f}s {len(results) / elapsed:>10,.0f} rec/s")
+
+
+def main():
+    records = make_records(N)
+    ndjson = "\n".join(json.dumps(r) for r in records).encode()
+    array = json.dumps(records).encode()
+    run("NDJSON", ndjson, iter_ndjson)
+    run("JSON array", array, iter_json_array)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Load time, memory and predict latency of the pickled health forest versus
+# its memory-mapped compact export. Each form is loaded by several worker
+# processes, as API workers would: the pickle is copied into each worker's
+# private memory, the export's pages are shared. Workers are started one after
+# another (so timings don't compete for the CPU) and all stay alive until the
+# last one has measured. Load time includes the imports unpickling triggers.
+# Run from the repo root: python -m benchmarks.bench_model_load
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+WORKERS = 4
+N_ESTIMATORS = 100
+
+
+def memory_mb():
+    # (RSS, private) of this process, from /proc (Linux)
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields["Rss"] / 1024, private / 1024
+
+
+def readings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(30, 200, n), rng.integers(50, 400, n),
+                            rng.integers(80, 200, n), rng.integers(80, 101, n)]).astype(float)
+
+
+def worker(mode, model_path, ready_path):
+    import joblib
+    from utils.compact_forest import CompactForest, compact_path
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    rss_before, private_before = memory_mb()
+    start = time.perf_counter()
+    model = joblib.load(model_path) if mode == "pickle" else CompactForest(compact_path(model_path))
+    load_ms = (time.perf_counter() - start) * 1000
+
+    batch = readings(1000)
+    model.predict(batch)  # touch every tree
+    single = batch[:1]
+    times = []
+    for _ in range(200):
+        start = time.perf_counter()
+        model.predict(single)
+        times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    rss, private = memory_mb()
+    print(f"{mode:>8} {load_ms:>8.1f}ms {rss - rss_before:>7.1f}MB {private - private_before:>9.1f}MB "
+          f"{np.median(times) * 1000:>8.2f}ms {batch_ms:>9.1f}ms", flush=True)
+    # Stay alive until every worker has measured, so shared pages stay mapped
+    open(ready_path, "a").close()
+    while len(os.listdir(os.path.dirname(ready_path))) < WORKERS:
+        time.sleep(0.05)
+
+
+def main():
+    from train_health_model import load, save_model, train
+    from utils.compact_forest import compact_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "health_model.pkl")
+        X, y = load(cache=False)
+        save_model(train(X, y, n_estimators=N_ESTIMATORS, n_jobs=-1), model_path)
+        export_bytes = sum(entry.stat().st_size for entry in os.scandir(compact_path(model_path)))
+        print(f"{N_ESTIMATORS}-tree forest: pickle {os.path.getsize(model_path) / 1e6:.1f} MB, "
+              f"compact export {export_bytes / 1e6:.1f} MB")
+        print(f"{'format':>8} {'load':>10} {'RSS +':>9} {'private +':>11} {'1 row':>10} {'1000 rows':>11}"
+              f"   ({WORKERS} workers each)")
+        for mode in ("pickle", "compact"):
+            ready = tempfile.mkdtemp(dir=tmp)
+            workers = []
+            for i in range(WORKERS):
+                workers.append(subprocess.Popen([sys.executable, "-m", "benchmarks.bench_model_load", mode,
+                                                 model_path, os.path.join(ready, str(i))]))
+                while len(os.listdir(ready)) <= i:
+                    time.sleep(0.05)
+            for process in workers:
+                process.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        worker(*sys.argv[1:])
+    else:
+        main()
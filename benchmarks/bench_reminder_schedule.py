@@ -0,0 +1,56 @@
+# Heap-based reminder schedule at scale: load time and per-fire cost for 100k
+# reminders, compared with one unindexed time-equality scan per minute.
+# Run from the repo root: python -m benchmarks.bench_reminder_schedule
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import timedelta
+
+from agents.reminder import ReminderAgent
+
+N = 100_000
+
+
+def main():
+    rng = random.Random(0)
+    rows = [(f"{rng.randrange(24):02d}:{rng.randrange(60):02d}", f"Reminder {i}", rng.choice(["ta", "hi", "te"]))
+            for i in range(N)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, time TEXT, message TEXT, language TEXT)")
+        conn.executemany("INSERT INTO reminders (time, message, language) VALUES (?, ?, ?)", rows)
+        conn.commit()
+
+        # Old approach: one full-table scan per minute of the day
+        start = time.perf_counter()
+        for minute in range(0, 24 * 60, 10):
+            conn.execute("SELECT message, language FROM reminders WHERE time = ?",
+                         (f"{minute // 60:02d}:{minute % 60:02d}",)).fetchall()
+        scan = (time.perf_counter() - start) / len(range(0, 24 * 60, 10))
+        conn.close()
+
+        start = time.perf_counter()
+        agent = ReminderAgent(db_path=path)
+        load = time.perf_counter() - start
+
+        # Replay one day in irregular steps (the loop may oversleep) and count fires
+        now = agent.last_check
+        end = now + timedelta(days=1)
+        fired = 0
+        start = time.perf_counter()
+        while now < end:
+            now += timedelta(seconds=rng.randint(30, 150))
+            fired += len(agent.due_reminders(now))
+        replay = time.perf_counter() - start
+
+    print(f"reminders:          {N}")
+    print(f"unindexed scan:     {scan * 1000:.2f} ms per minute tick")
+    print(f"heap load + index:  {load * 1000:.0f} ms")
+    print(f"fired in one day:   {fired} ({replay / fired * 1e6:.1f} us per fire)")
+
+
+if __name__ == "__main__":
+    main()
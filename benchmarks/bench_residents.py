@@ -0,0 +1,51 @@
+# Memory per resident and per-tick cost of the safety and health agents as the
+# number of supervised devices grows.
+# Run from the repo root: python -m benchmarks.bench_residents
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+from agents.health import HealthAgent
+from agents.residents import ResidentTable
+from agents.safety import SafetyAgent
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def device_ids(n):
+    return [f"D{1000 + i}" for i in range(n)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = ResidentTable(device_ids(100_000))
+    per_resident = (tracemalloc.get_traced_memory()[0] - before) / len(table)
+    tracemalloc.stop()
+    print(f"ResidentTable: {per_resident:.0f} bytes per resident (100k residents, ids included)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite")
+        print(f"{'residents':>9} {'safety tick':>12} {'health tick':>12}")
+        for n in (100, 1_000, 10_000):
+            safety = SafetyAgent(db_path, device_ids=device_ids(n))
+            health = HealthAgent(db_path, device_ids=device_ids(n))
+            safety_ms = timed(safety.check_inactivity)
+            health_ms = timed(lambda: (health.monitor_all(), health.writer.flush()))
+            print(f"{n:>9} {safety_ms:>10.2f}ms {health_ms:>10.1f}ms")
+        health.writer.close()
+
+
+if __name__ == "__main__":
+    main()
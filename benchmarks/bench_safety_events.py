@@ -0,0 +1,115 @@
+# Fall-detection pipeline under a high event rate from many rooms: cost of
+# one event through the SafetyAgent state machine (alone and in batches), of
+# a full /iot/safety request, and how many database commits the alerts took.
+# Run from the repo root: python -m benchmarks.bench_safety_events
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from flask import Flask, request
+
+from agents.safety import ACTIVITIES, IMPACTS, SafetyAgent
+from api.ingest import iter_ndjson, parse_safety_event, process_safety_records
+
+N = 200_000
+DEVICES = 10_000
+RATE = 20_000  # events per second of simulated time
+LOCATIONS = ("Bedroom", "Bathroom", "Living Room", "Kitchen")
+
+
+def make_records(n, start, seed=0):
+    # Mix of safety_monitoring.csv: ~5% falls, impact evenly spread, residents
+    # who fell lie still for a while and may get up again later
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        record = {"device_id": f"D{1000 + rng.randrange(DEVICES)}", "timestamp": start + i / RATE,
+                  "activity": rng.choice(ACTIVITIES), "location": rng.choice(LOCATIONS)}
+        if rng.random() < 0.05:
+            record.update(activity="No Movement", fall_detected=True, impact=rng.choice(IMPACTS),
+                          post_fall_inactivity=rng.randint(0, 600))
+        records.append(record)
+    return records
+
+
+def safety_app(agent):
+    # The /iot/safety route of api/main.py over `agent`; importing api.main
+    # itself would open db/memory.sqlite (and write alerts into it) and load
+    # the trained health model
+    app = Flask(__name__)
+
+    @app.route("/iot/safety", methods=["POST"])
+    def receive_safety():
+        try:
+            event = parse_safety_event(request.get_json(silent=True))
+        except ValueError as e:
+            return {"status": "invalid", "error": str(e)}, 400
+        alerts = agent.process_events([event])
+        return {"status": "received", "alerts": [{"device_id": d, "level": l, "message": m}
+                                                 for d, l, m in alerts]}, 200
+
+    return app
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    start = time.time()
+    records = make_records(N, start)
+    events = [parse_safety_event(r) for r in records]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+
+        agent = SafetyAgent(path, device_ids=())
+        latencies = []
+        alerts = 0
+        for event in events:
+            t0 = time.perf_counter()
+            alerts += len(agent.process_events([event]))
+            latencies.append(time.perf_counter() - t0)
+        agent.writer.flush()
+        single = sum(latencies)
+        commits = agent.writer.stats["commits"]
+
+        agent = SafetyAgent(os.path.join(tmp, "batch.sqlite"), device_ids=())
+        t0 = time.perf_counter()
+        for i in range(0, N, 1000):
+            agent.process_events(events[i:i + 1000])
+        batched = time.perf_counter() - t0
+
+        body = "\n".join(json.dumps(r) for r in records[:20_000]).encode()
+        t0 = time.perf_counter()
+        process_safety_records(iter_ndjson(io.BytesIO(body)), agent)
+        ndjson = time.perf_counter() - t0
+
+        agent.writer.flush()
+        api_agent = SafetyAgent(os.path.join(tmp, "api.sqlite"), device_ids=())
+        client = safety_app(api_agent).test_client()
+        request_latencies = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for record in records[:2_000]:
+                t0 = time.perf_counter()
+                client.post("/iot/safety", json=record)
+                request_latencies.append(time.perf_counter() - t0)
+        api_agent.writer.flush()
+
+    print(f"events:            {N} from {DEVICES} rooms ({alerts} alerts raised inline)")
+    print(f"one event:         p50 {percentile(latencies, 0.5) * 1e6:.1f} us, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.1f} us, max {max(latencies) * 1000:.2f} ms")
+    print(f"single-event rate: {N / single:,.0f} events/s")
+    print(f"batches of 1000:   {N / batched:,.0f} events/s")
+    print(f"NDJSON batch body: {20_000 / ndjson:,.0f} events/s (parse + validate + state machine)")
+    print(f"POST /iot/safety:  p50 {percentile(request_latencies, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentile(request_latencies, 0.99) * 1000:.2f} ms (Flask test client)")
+    print(f"database commits:  {commits} for {alerts} alert rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Inactivity detection for 100k residents under 10k motion events per second:
+# cost of a motion event and of a one-second check with the timer wheel,
+# alerts fired per idle resident and how late they fire, next to the old
+# once-a-minute scan of every resident's last_movement.
+# Run from the repo root: python -m benchmarks.bench_safety_inactivity
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from agents.safety import INACTIVITY_LIMIT, SafetyAgent
+
+N = 100_000
+IDLE = 1_000      # residents that stop moving when the replay starts
+RATE = 10_000     # motion events per second across the others
+SECONDS = INACTIVITY_LIMIT + 60
+
+
+def main():
+    rng = np.random.default_rng(0)
+    ids = [f"D{1000 + i}" for i in range(N)]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        safety = SafetyAgent(os.path.join(tmp, "bench.sqlite"), device_ids=ids)
+        setup = time.perf_counter() - start
+        clock = time.time()
+        for device_id in ids:
+            safety.simulate_motion(device_id, clock)
+
+        motion = checks = 0.0
+        fired = {}
+        late = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for second in range(1, SECONDS + 1):
+                movers = rng.integers(IDLE, N, RATE)
+                times = clock + second - 1 + np.sort(rng.random(RATE))
+                start = time.perf_counter()
+                for slot, t in zip(movers.tolist(), times.tolist()):
+                    safety.simulate_motion(ids[slot], t)
+                motion += time.perf_counter() - start
+
+                now = clock + second
+                start = time.perf_counter()
+                inactive = safety.check_inactivity(now)
+                checks += time.perf_counter() - start
+                for device_id in inactive:
+                    fired[device_id] = fired.get(device_id, 0) + 1
+                    late.append(now - safety.residents.get(device_id, "last_movement") - INACTIVITY_LIMIT)
+        safety.writer.close()
+
+    # Old approach: copy and compare every resident's last_movement once a minute
+    last_movement = safety.residents.column("last_movement")
+    start = time.perf_counter()
+    for _ in range(20):
+        np.flatnonzero(safety.residents.column("last_movement") < clock + SECONDS - INACTIVITY_LIMIT)
+    scan = (time.perf_counter() - start) / 20
+    overdue = int((last_movement < clock + SECONDS - INACTIVITY_LIMIT).sum())
+
+    events = RATE * SECONDS
+    print(f"residents:           {N} ({IDLE} idle), {RATE} motion events/s for {SECONDS}s")
+    print(f"agent setup:         {setup * 1000:.0f} ms")
+    print(f"motion event:        {motion / events * 1e6:.2f} us ({events / motion:,.0f} events/s on one core)")
+    print(f"1s inactivity check: {checks / SECONDS * 1000:.3f} ms mean")
+    print(f"alerts:              {sum(fired.values())} for {len(fired)} residents "
+          f"(max {max(fired.values())} per resident)")
+    print(f"detection delay:     {max(late):.2f} s max past the {INACTIVITY_LIMIT}s limit")
+    print(f"old 60s scan:        {scan * 1000:.2f} ms per tick, up to 60 s late, "
+          f"re-alerting all {overdue} overdue residents every tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Time and peak memory of loading training data in one read versus the chunked
+# loader, without and with the cleaned-data cache (first run fills it, second
+# reads it back), on a health_monitoring.csv replicated to a few million rows.
+# Each mode runs in its own process so peak RSS is measured cleanly.
+# Run from the repo root: python -m benchmarks.bench_training_loader
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from train_health_model import (FEATURES, TARGET, clean_health_data, health_cache_version,
+                                iter_health_chunks, sample_chunks)
+from utils.frame_cache import cache_path
+
+COPIES = 300  # ~3M rows, ~190 MB of CSV
+SAMPLE = 200_000
+
+
+def build_csv(path):
+    raw = pd.read_csv("health_monitoring.csv")
+    header = True
+    with open(path, "w", newline="") as f:
+        for _ in range(COPIES):
+            raw.to_csv(f, index=False, header=header)
+            header = False
+
+
+def run(mode, path):
+    start = time.perf_counter()
+    if mode == "full":
+        data = clean_health_data(pd.read_csv(path))
+        X, y = data[FEATURES], data[TARGET].map({'Yes': 1, 'No': 0})
+    else:
+        X, y = sample_chunks(iter_health_chunks(path, cache=mode != "chunked"), SAMPLE)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>12} {len(X):>10,} rows kept {elapsed:>7.1f}s  peak RSS {peak_mb:>7.0f} MB")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "health.csv")
+        build_csv(path)
+        print(f"{path}: {os.path.getsize(path) / 1e6:.0f} MB")
+        for mode in ("full", "chunked", "cache-cold", "cache-warm"):
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_training_loader", mode, path], check=True)
+        os.remove(cache_path(path, "health", health_cache_version()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(*sys.argv[1:])
+    else:
+        main()
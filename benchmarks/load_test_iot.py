@@ -0,0 +1,63 @@
+# Load test for the IoT ingestion API.
+# Start the server first (python -m api.main), then run:
+#   python -m benchmarks.load_test_iot --threads 16 --seconds 10
+import argparse
+import random
+import threading
+import time
+
+import requests
+
+
+def worker(url, deadline, latencies, errors):
+    session = requests.Session()
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        payload = {
+            "heart_rate": rng.randint(65, 110),
+            "bp_systolic": rng.randint(110, 160),
+            "bp_diastolic": rng.randint(70, 100),
+            "spo2": rng.randint(90, 100),
+        }
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=5)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors.append(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="http://127.0.0.1:5000")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(f"{args.host}/iot/health", deadline, latencies, errors))
+               for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    n = len(latencies)
+    print(f"requests:   {n} in {elapsed:.1f}s ({n / elapsed:,.0f} req/s), errors: {len(errors)}")
+    if n:
+        print(f"latency:    p50={latencies[n // 2] * 1000:.1f}ms p99={latencies[int(n * 0.99)] * 1000:.1f}ms")
+
+    # Give the worker a moment to drain, then show what the server persisted
+    time.sleep(0.5)
+    print("server:    ", requests.get(f"{args.host}/iot/health/stats", timeout=5).json())
+
+
+if __name__ == "__main__":
+    main()
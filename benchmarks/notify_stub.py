@@ -0,0 +1,115 @@
+# Local stand-ins for the notification channels of utils/outbox.py: a webhook
+# receiver and a bare-bones SMTP server, both counting deliveries per
+# idempotency key so repeats are visible. Run standalone
+# (python -m benchmarks.notify_stub) or start in-process with start_stubs()
+# and adjust at runtime:
+#   server.delay      seconds spent on each delivery
+#   server.fail_rate  share of deliveries answered with a transient error
+#                     (HTTP 503 / SMTP 451)
+import argparse
+import json
+import random
+import socketserver
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(server.delay)
+        if random.random() < server.fail_rate:
+            status = 503
+        else:
+            status = 200
+            with server.lock:
+                server.received[self.headers.get("Idempotency-Key")] += 1
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    # Just enough of RFC 5321 for smtplib: EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self.reply("220 stub ESMTP")
+        for raw in self.rfile:
+            command = raw.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stub")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                message_id = None
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    if line.lower().startswith(b"message-id:"):
+                        message_id = line.split(b":", 1)[1].strip().strip(b"<>").split(b"@")[0].decode()
+                time.sleep(server.delay)
+                if random.random() < server.fail_rate:
+                    self.reply("451 Try again later")
+                else:
+                    with server.lock:
+                        server.received[message_id] += 1
+                    self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _start(server, delay, fail_rate):
+    server.delay = delay
+    server.fail_rate = fail_rate
+    server.received = Counter()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_stubs(webhook_port=0, smtp_port=0, delay=0.0, fail_rate=0.0):
+    webhook = _start(WebhookServer(("127.0.0.1", webhook_port), WebhookHandler), delay, fail_rate)
+    webhook.url = f"http://127.0.0.1:{webhook.server_address[1]}/notify"
+    smtp = _start(SmtpServer(("127.0.0.1", smtp_port), SmtpHandler), delay, fail_rate)
+    smtp.port = smtp.server_address[1]
+    return webhook, smtp
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--webhook-port", type=int, default=8025)
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    webhook, smtp = start_stubs(args.webhook_port, args.smtp_port, args.delay, args.fail_rate)
+    print(f"Webhook stub on {webhook.url}, SMTP stub on 127.0.0.1:{smtp.port}")
+    threading.Event().wait()
@@ -0,0 +1,95 @@
+# Minimal stand-in for Ollama's /api/generate, for exercising DoctorAgent
+# without a model server. Run standalone (python -m benchmarks.ollama_stub)
+# or start in-process with start_stub() and flip its behaviour at runtime:
+#   server.delay  seconds before the first byte
+#   server.mode   "ok", "error" (HTTP 500) or "hang" (never answers)
+#   server.token_interval  seconds per generated token (streamed or not)
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = ("Check the pulse and breathing first. Help the patient sit or lie down comfortably. "
+         "If vitals stay abnormal for more than a few minutes, call emergency services. "
+         "Keep the patient calm and do not give food or drink.")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server.requests += 1
+        if server.mode == "hang":
+            time.sleep(3600)
+        time.sleep(server.delay)
+        if server.mode == "error":
+            self._send(500, b'{"error": "model crashed"}')
+            return
+        if body.get("stream"):
+            self._stream()
+        else:
+            # A real model still generates every token before answering
+            time.sleep(server.token_interval * len(REPLY.split(" ")))
+            self._send(200, json.dumps({"model": body.get("model"), "response": REPLY, "done": True}).encode())
+
+    def _send(self, status, payload, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self):
+        # NDJSON, one token per line, like Ollama with "stream": true
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = [word + " " for word in REPLY.split(" ")]
+        for token in tokens:
+            self._chunk(json.dumps({"response": token, "done": False}).encode() + b"\n")
+            time.sleep(self.server.token_interval)
+        self._chunk(json.dumps({"response": "", "done": True}).encode() + b"\n")
+        self._chunk(b"")
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is expected, not worth a traceback
+        pass
+
+
+def start_stub(port=0, delay=0.0, mode="ok", token_interval=0.02):
+    server = StubServer(("127.0.0.1", port), StubHandler)
+    server.delay = delay
+    server.mode = mode
+    server.token_interval = token_interval
+    server.requests = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["ok", "error", "hang"], default="ok")
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    args = parser.parse_args()
+    stub = start_stub(args.port, args.delay, args.mode, args.token_interval)
+    print(f"Ollama stub listening on {stub.url}")
+    threading.Event().wait()
@@ -1,65 +1,33 @@
-<<<<<<< HEAD
 from agents.reminder import ReminderAgent
 from agents.safety import SafetyAgent
 from agents.health import HealthAgent
 from agents.social import SocialAgent
 from agents.family import FamilyAgent
 from agents.doctor import DoctorAgent
-import sqlite3
-import time
+from utils.outbox import OutboxDispatcher
+from utils.rollups import HealthRollups
+from utils.scheduler import AgentScheduler
+import asyncio
 import random
+import sqlite3
 
-# Initialize DB
-def setup_db():
-    conn = sqlite3.connect("db/memory.sqlite")
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            time TEXT NOT NULL,
-            message TEXT NOT NULL,
-            language TEXT NOT NULL
-        )
-    """)
-    cursor.execute("INSERT OR IGNORE INTO reminders (time, message, language) VALUES (?, ?, ?)",
-                   ("14:30", "மருந்து எடுத்துக்கொள்ளுங்கள்", "ta"))
-    cursor.execute("INSERT OR IGNORE INTO reminders (time, message, language) VALUES (?, ?, ?)",
-                   ("14:30", "अपनी दवाई लीजिए", "hi"))
-    cursor.execute("INSERT OR IGNORE INTO reminders (time, message, language) VALUES (?, ?, ?)",
-                   ("14:30", "మీ మందును తీసుకోండి", "te"))
-    conn.commit()
-    conn.close()
+# Seconds between ticks of each agent, and how long a tick may take before it
+# is reported as stuck. Reminders and inactivity checks sleep until the next
+# one is due (capped so newly added rows and devices are picked up).
+CADENCE = {"health": 60, "safety_max": 60, "social": 60, "reminder_max": 60, "family": 60, "rollup": 60,
+           "retention": 3600, "stats": 300}
+TIMEOUT = {"health": 10, "safety": 10, "social": 30, "reminder": 30}
 
-setup_db()
-reminder = ReminderAgent()
-safety = SafetyAgent()
-health = HealthAgent()
-social = SocialAgent()
-family = FamilyAgent()
-doctor = DoctorAgent()
+# Residents supervised by this process, by Device-ID/User-ID
+DEVICE_IDS = ["D1000"]
 
-print("🚀 Starting Elderly Care AI...")
-while True:
-    reminder.check_and_remind()
-    if safety.check_inactivity():
-        family.send_alert("Inactivity detected for 5 minutes!")
-        doctor.consult("Patient inactive for 5 minutes. Advice?")
-    health_pred = health.monitor_health()
-    if health_pred:
-        family.send_alert("Critical health condition detected!")
-        doctor.consult("Critical vitals detected. What to do?")
-    social.cheer_up(random.choice(["ta", "hi", "te"]))
-    time.sleep(60)
-=======
-from agents.reminder import ReminderAgent
-from agents.safety import SafetyAgent
-from agents.health import HealthAgent
-from agents.social import SocialAgent
-from agents.family import FamilyAgent
-from agents.doctor import DoctorAgent
-import sqlite3
-import time
-import random
+# Who is notified at each escalation tier of an incident, as (channel,
+# recipient), and the delivery channel behind each name, e.g.
+#   CONTACTS = {0: [("email", "family@example.org")], 1: [("webhook", "caregiver")]}
+#   CHANNELS = {"email": SmtpChannel("localhost"), "webhook": WebhookChannel("https://...")}
+# Empty: incidents are only logged to the alerts table.
+CONTACTS = {}
+CHANNELS = {}
 
 # Initialize DB
 def setup_db():
@@ -82,24 +50,77 @@ def setup_db():
     conn.commit()
     conn.close()
 
-setup_db()
-reminder = ReminderAgent()
-safety = SafetyAgent()
-health = HealthAgent()
-social = SocialAgent()
-family = FamilyAgent()
-doctor = DoctorAgent()
+def build_scheduler():
+    reminder = ReminderAgent()
+    safety = SafetyAgent(device_ids=DEVICE_IDS)
+    health = HealthAgent(device_ids=DEVICE_IDS)
+    social = SocialAgent()
+    family = FamilyAgent(contacts=CONTACTS)
+    doctor = DoctorAgent()
+    rollups = HealthRollups()
+    scheduler = AgentScheduler()
+
+    # Each tick covers every resident. Doctor consultations run on the doctor's
+    # own thread so a slow LLM call never holds up the agent that raised the alert.
+    def safety_tick():
+        inactive = safety.check_inactivity()
+        for device_id in inactive:
+            family.send_alert("Inactivity detected for 5 minutes!", device_id, "inactivity")
+        if inactive:
+            scheduler.submit("doctor", doctor.consult, "Patient inactive for 5 minutes. Advice?")
+        falls = safety.check_falls()
+        for device_id, level, message in falls:
+            family.send_alert(message, device_id, f"fall:{level}")
+        if falls:
+            scheduler.submit("doctor", doctor.consult, "Resident fell and has not got up. What to do?")
+
+    def health_tick():
+        critical = health.monitor_all()
+        for device_id in critical:
+            family.send_alert("Critical health condition detected!", device_id, "critical_vitals")
+        if critical:
+            scheduler.submit("doctor", doctor.consult, "Critical vitals detected. What to do?")
+
+    def social_tick():
+        social.cheer_up(random.choice(["ta", "hi", "te"]))
+
+    def safety_interval():
+        wait = safety.seconds_until_next()
+        return CADENCE["safety_max"] if wait is None else min(wait, CADENCE["safety_max"])
+
+    def reminder_interval():
+        wait = reminder.seconds_until_next()
+        return CADENCE["reminder_max"] if wait is None else min(wait, CADENCE["reminder_max"])
+
+    def stats_tick():
+        for name, stats in scheduler.summary().items():
+            print(f"📊 {name}: {stats}")
+
+    scheduler.add("health", health_tick, CADENCE["health"], TIMEOUT["health"])
+    scheduler.add("safety", safety_tick, safety_interval, TIMEOUT["safety"])
+    scheduler.add("reminder", reminder.check_and_remind, reminder_interval, TIMEOUT["reminder"])
+    scheduler.add("social", social_tick, CADENCE["social"], TIMEOUT["social"])
+    scheduler.add("family", family.close_incidents, CADENCE["family"])
+    scheduler.add("rollup", rollups.update, CADENCE["rollup"])
+    scheduler.add("retention", rollups.prune, CADENCE["retention"])
+    scheduler.add("doctor")
+    scheduler.add("stats", stats_tick, CADENCE["stats"])
+    return scheduler
+
+async def run(scheduler, outbox):
+    await asyncio.gather(scheduler.run(), outbox.run())
+
+def main():
+    setup_db()
+    scheduler = build_scheduler()
+    # Delivers family notifications queued by FamilyAgent, off the agent threads
+    outbox = OutboxDispatcher(channels=CHANNELS)
+    print("🚀 Starting Elderly Care AI...")
+    try:
+        asyncio.run(run(scheduler, outbox))
+    except KeyboardInterrupt:
+        for name, stats in scheduler.summary().items():
+            print(f"📊 {name}: {stats}")
 
-print("🚀 Starting Elderly Care AI...")
-while True:
-    reminder.check_and_remind()
-    if safety.check_inactivity():
-        family.send_alert("Inactivity detected for 5 minutes!")
-        doctor.consult("Patient inactive for 5 minutes. Advice?")
-    health_pred = health.monitor_health()
-    if health_pred:
-        family.send_alert("Critical health condition detected!")
-        doctor.consult("Critical vitals detected. What to do?")
-    social.cheer_up(random.choice(["ta", "hi", "te"]))
-    time.sleep(60)
->>>>>>> 7390bf1e558969d04af97332ef20225c025a40de
+if __name__ == "__main__":
+    main()
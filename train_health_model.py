@@ -1,20 +1,212 @@
-<<<<<<< HEAD
+import argparse
+import json
+import os
+import shutil
+import time
+import warnings
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 import joblib
+from joblib import Parallel, delayed
+from utils.compact_forest import compact_path, export_forest
+from utils.features import HEALTH_FEATURES, schema_path
+from utils.frame_cache import cached_chunks
+from utils.rolling import RollingVitals, health_schema
+
+# A measurement is kept when it is a plain non-negative decimal ("72", "98.5",
+# "12.", ".5"), either alone or as the first word of a value with spaces
+# ("72 bpm"); anything else becomes 0.0
+NUMBER = r'\d+\.?\d*|\.\d+'
+TIMESTAMP = r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})'
+
+def per_distinct(col, parse):
+    # Exports repeat the same strings over and over (minute-resolution
+    # timestamps, common BP readings), so parse each distinct value once and
+    # broadcast the results back to every row
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    parsed = parse(pd.Series(uniques, dtype=col.dtype))
+    result = parsed.take(codes)
+    result.index = col.index
+    return result
+
+def _parse_text_measurement(text):
+    first_word = text.str.extract(rf'^\s*({NUMBER})(?:\s|\Z)', expand=False)
+    # Values without a space must be the number alone
+    ok = text.str.contains(' ', regex=False) | text.str.fullmatch(NUMBER)
+    return pd.to_numeric(first_word.where(ok), errors='coerce').fillna(0.0).astype(float)
+
+def parse_measurement(col):
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        # Numeric columns skip string parsing but keep its results: negatives,
+        # NaN/inf and floats that str() renders in exponent form become 0.0
+        values = col.astype(float)
+        if pd.api.types.is_integer_dtype(col):
+            plain = values >= 0
+        else:
+            plain = (values == 0) | ((values >= 1e-4) & (values < 1e16))
+        return values.where(plain, 0.0)
+    return per_distinct(col.astype(str), _parse_text_measurement)
+
+def _parse_blood_pressure(text):
+    # Systolic is whatever precedes the first '/', diastolic the number after it
+    parts = text.str.extract(rf'^([^/]*)/\s*({NUMBER})?')
+    return pd.DataFrame({
+        'systolic': parts[0].fillna('0').astype(float),
+        'diastolic': pd.to_numeric(parts[1], errors='coerce').fillna(0.0).astype(float),
+    })
 
-# Load the datasets
-health_data = pd.read_csv('health_monitoring.csv')
-safety_data = pd.read_csv('safety_monitoring.csv')
-
-# Display raw data for debugging
-print("Raw Health Monitoring Data (First 5 Rows):")
-print(health_data.head().to_string())
-print("\nRaw Safety Monitoring Data (First 5 Rows):")
-print(safety_data.head().to_string())
+def _parse_timestamp(text):
+    return pd.to_datetime(text.str.extract(TIMESTAMP)[0], errors='coerce')
+
+# Columns training actually reads, with dtypes fixed up front so pandas never
+# infers them per chunk. Measurements arrive as free text ("72 bpm"), flags
+# as Yes/No categoricals (one byte per row instead of a string). The features
+# are the ones HealthAgent receives from devices (HEALTH_FEATURES), so glucose
+# is not used; 'Blood Pressure' yields both systolic and diastolic.
+FEATURES = HEALTH_FEATURES.columns
+TARGET = 'Caregiver Notified (Yes/No)'
+YES_NO = pd.CategoricalDtype(['No', 'Yes'])
+HEALTH_DTYPES = {
+    'Heart Rate': str,
+    'Blood Pressure': str,
+    'Oxygen Saturation (SpO₂%)': str,
+    TARGET: YES_NO,
+}
+SAFETY_DTYPES = {
+    'Device-ID/User-ID': str,
+    'Timestamp': str,
+    'Movement Activity': str,
+    'Fall Detected (Yes/No)': YES_NO,
+    'Impact Force Level': str,
+    'Post-Fall Inactivity Duration (Seconds)': 'float64',
+    'Location': str,
+    'Alert Triggered (Yes/No)': YES_NO,
+    'Caregiver Notified (Yes/No)': YES_NO,
+}
+CHUNKSIZE = 100_000
+SAMPLE_ROWS = 1_000_000
+
+# Output file names, fixed so reruns overwrite instead of accumulating
+MODEL_FILE = 'health_model.pkl'
+PLOT_FILE = 'feature_importance.png'
+METRICS_FILE = 'health_model_metrics.json'
+
+# Bump whenever clean_health_data/clean_safety_data change their output, so
+# cached cleaned frames from older code are not reused
+CLEANING_VERSION = 1
+
+# Extra columns read when trend features are on: whose reading it is and when
+HISTORY_DTYPES = {'Device-ID/User-ID': str, 'Timestamp': str}
+
+def health_cache_version(trend_window=None):
+    return f"{CLEANING_VERSION}:{list(HEALTH_DTYPES)}:{health_schema(trend_window).to_dict()}"
+
+def _clean_health_chunks(path, chunksize, trend_window=None):
+    schema = health_schema(trend_window)
+    dtypes = {**HEALTH_DTYPES, **HISTORY_DTYPES} if trend_window else HEALTH_DTYPES
+    trends = RollingVitals(trend_window) if trend_window else None
+    reader = pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        chunk = clean_health_data(chunk)
+        X = HEALTH_FEATURES.build(chunk, validate=False)
+        # Rows serving would reject (unparseable or implausible vitals) are not learned from
+        valid = HEALTH_FEATURES.valid(X)
+        if trends is not None:
+            # Readings without a usable timestamp can't be placed in a history
+            valid &= chunk['Timestamp'].notna().to_numpy()
+            X, chunk = X[valid], chunk[valid]
+            # The same engine HealthAgent runs on live readings, fed in time
+            # order (within a chunk; the export is expected to be roughly
+            # chronological across chunks)
+            minutes = ((chunk['Timestamp'] - pd.Timestamp(0)) / pd.Timedelta(minutes=1)).to_numpy()
+            order = np.argsort(minutes, kind='stable')
+            stats = np.empty((len(X), len(schema) - len(HEALTH_FEATURES)), dtype=np.float32)
+            stats[order] = trends.update(chunk['Device-ID/User-ID'].to_numpy()[order], minutes[order], X[order])
+            X = np.hstack([X, stats])
+        else:
+            X, chunk = X[valid], chunk[valid]
+        cleaned = pd.DataFrame(X, columns=schema.columns, index=chunk.index)
+        cleaned[TARGET] = (chunk[TARGET] == 'Yes').astype('int8')
+        yield cleaned
+
+def iter_health_chunks(path='health_monitoring.csv', chunksize=CHUNKSIZE, cache=True, trend_window=None):
+    # Cleaned (features, target) chunks; only one raw chunk is in memory at a
+    # time. With cache, a previous run's cleaned output is reused when the
+    # file and the cleaning code are unchanged. trend_window (minutes) adds
+    # the rolling trend features of utils/rolling.py.
+    produce = lambda: _clean_health_chunks(path, chunksize, trend_window)
+    if cache:
+        chunks = cached_chunks(path, 'health', health_cache_version(trend_window), produce)
+    else:
+        chunks = produce()
+    columns = health_schema(trend_window).columns
+    for chunk in chunks:
+        yield chunk[columns], chunk[TARGET]
+
+def _clean_safety_chunks(path, chunksize):
+    reader = pd.read_csv(path, usecols=list(SAFETY_DTYPES), dtype=SAFETY_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        yield clean_safety_data(chunk)
+
+def iter_safety_chunks(path='safety_monitoring.csv', chunksize=CHUNKSIZE, cache=True):
+    if not cache:
+        yield from _clean_safety_chunks(path, chunksize)
+        return
+    version = f"{CLEANING_VERSION}:{list(SAFETY_DTYPES)}"
+    yield from cached_chunks(path, 'safety', version, lambda: _clean_safety_chunks(path, chunksize))
+
+def sample_chunks(chunks, n=SAMPLE_ROWS, seed=42):
+    # Uniform down-sample of at most n rows from a stream of (X, y) chunks:
+    # every row draws a random key and the n smallest keys survive, so memory
+    # stays at n rows plus one chunk however long the stream is
+    rng = np.random.default_rng(seed)
+    kept_X, kept_y, kept_keys = None, None, None
+    for X, y in chunks:
+        keys = rng.random(len(X))
+        if kept_X is not None:
+            X, y = pd.concat([kept_X, X]), pd.concat([kept_y, y])
+            keys = np.concatenate([kept_keys, keys])
+        if len(keys) > n:
+            keep = np.sort(np.argpartition(keys, n)[:n])
+            X, y, keys = X.iloc[keep], y.iloc[keep], keys[keep]
+        kept_X, kept_y, kept_keys = X, y, keys
+    if kept_X is None:
+        return pd.DataFrame(columns=FEATURES, dtype='float32'), pd.Series(dtype='int8')
+    return kept_X, kept_y
+
+def is_holdout(index):
+    # Every fifth row is held out for evaluation, decided by row number so the
+    # split is the same on every pass over the stream
+    return np.asarray(index) % 5 == 0
+
+def train_incremental(path='health_monitoring.csv', chunksize=CHUNKSIZE, epochs=3, cache=True, trend_window=None):
+    # Out-of-core alternative to the forest: a linear model fitted chunk by
+    # chunk. One pass learns the feature scaling, then each epoch streams the
+    # file again into partial_fit.
+    scaler = StandardScaler()
+    for X, y in iter_health_chunks(path, chunksize, cache, trend_window):
+        scaler.partial_fit(X[~is_holdout(X.index)])
+    model = SGDClassifier(loss='log_loss', random_state=42)
+    for _ in range(epochs):
+        for X, y in iter_health_chunks(path, chunksize, cache, trend_window):
+            train = ~is_holdout(X.index)
+            if train.any():
+                model.partial_fit(scaler.transform(X[train]), y[train], classes=[0, 1])
+
+    # Evaluate on the held-out rows, accumulating a confusion matrix per chunk
+    counts = np.zeros((2, 2), dtype=np.int64)
+    for X, y in iter_health_chunks(path, chunksize, cache, trend_window):
+        test = is_holdout(X.index)
+        if test.any():
+            counts += confusion_matrix(y[test], model.predict(scaler.transform(X[test])), labels=[0, 1])
+    return make_pipeline(scaler, model), counts
 
 # Data Cleaning for Health Monitoring Data
 def clean_health_data(df):
@@ -27,495 +219,28 @@ def clean_health_data(df):
         'Alert Triggered (Yes/No)': 'No',
         'Caregiver Notified (Yes/No)': 'No'
     })
-    
-    # Extract numeric values and standardize format
-    # Heart Rate: Extract number, validate, and keep as float for now
-    df['Heart Rate'] = df['Heart Rate'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    # Glucose Levels: Same approach
-    df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    # Blood Pressure: Extract systolic (before '/')
-    df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(
-        lambda x: x.split('/')[0] if '/' in x else '0'
-    ).astype(float)
-    # Oxygen Saturation: Extract number
-    df['Oxygen Saturation (SpO₂%)'] = df['Oxygen Saturation (SpO₂%)'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    
-    # Convert Timestamp to datetime
-    df['Timestamp'] = pd.to_datetime(
-        df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], 
-        errors='coerce'
-    )
-    
-    # Validate ranges
-    df['Heart Rate'] = df['Heart Rate'].apply(
-        lambda x: x if 30 <= x <= 200 else 60.0
-    )
-    df['Glucose Levels'] = df['Glucose Levels'].apply(
-        lambda x: x if 50 <= x <= 400 else 100.0
-    )
-    
-    return df
-
-# Data Cleaning for Safety Monitoring Data
-def clean_safety_data(df):
-    # Fill or drop missing values
-    df = df.fillna({
-        'Movement Activity': 'No Movement',
-        'Fall Detected (Yes/No)': 'No',
-        'Impact Force Level': '-',
-        'Post-Fall Inactivity Duration (Seconds)': 0,
-        'Location': 'Unknown',
-        'Alert Triggered (Yes/No)': 'No',
-        'Caregiver Notified (Yes/No)': 'No'
-    })
-    
-    # Convert Timestamp to datetime
-    df['Timestamp'] = pd.to_datetime(
-        df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], 
-        errors='coerce'
-    )
-    
-    return df
 
-# Clean the datasets
-health_data = clean_health_data(health_data)
-safety_data = clean_safety_data(safety_data)
-
-# Feature Engineering
-features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpO₂%)']
-
-# Target variable
-health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# Split data into features and target
-X = health_data[features]
-y = health_data['Caregiver Notified (Yes/No)']
-
-# Handle missing values in features
-X = X.fillna(X.mean())
-
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Train the Random Forest Classifier
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Predict on test set
-y_pred = model.predict(X_test)
-
-# Evaluate the model
-accuracy = accuracy_score(y_test, y_pred)
-print(f"\nModel Accuracy: {accuracy:.2f}")
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
-
-# Visualize feature importance
-importances = model.feature_importances_
-plt.figure(figsize=(10, 5))
-plt.bar(features, importances)
-plt.title('Feature Importance')
-plt.xlabel('Features')
-plt.ylabel('Importance')
-plt.show()
-
-# Save the model
-joblib.dump(model, 'health_model.pkl')
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# from sklearn.metrics import accuracy_score, classification_report
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display raw data for debugging
-# print("Raw Health Monitoring Data (First 5 Rows):")
-# print(health_data.head().to_string())
-# print("\nRaw Safety Monitoring Data (First 5 Rows):")
-# print(safety_data.head().to_string())
-
-# # Data Cleaning for Health Monitoring Data
-# def clean_health_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({
-#         'Heart Rate': '0 Yes',
-#         'Glucose Levels': '0 Yes',
-#         'Blood Pressure': '0/0',
-#         'Oxygen Saturation (SpO₂%)': '0 No',
-#         'Alert Triggered (Yes/No)': 'No',
-#         'Caregiver Notified (Yes/No)': 'No'
-#     })
-    
-#     # Extract numeric values and standardize format
-#     df['Heart Rate'] = df['Heart Rate'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x.replace('/', ' ').split()[0] + '/' + x.replace('/', ' ').split()[1] if '/' in x else '0/0')
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     # Validate ranges (optional, adjust thresholds)
-#     df['Heart Rate'] = df.apply(lambda row: row['Heart Rate'] if (int(row['Heart Rate'].split()[0]) <= 200 and int(row['Heart Rate'].split()[0]) >= 30) else '60 Yes', axis=1)
-#     df['Glucose Levels'] = df.apply(lambda row: row['Glucose Levels'] if (int(row['Glucose Levels'].split()[0]) <= 400 and int(row['Glucose Levels'].split()[0]) >= 50) else '100 Yes', axis=1)
-    
-#     return df
-
-# # Data Cleaning for Safety Monitoring Data
-# def clean_safety_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({
-#         'Movement Activity': 'No Movem',
-#         'Fall Detected (Yes/No)': 'No',
-#         'Impact Force Level': '-',
-#         'Post-Fall Inactivity Duration (Seconds)': 0,
-#         'Location': '0 Unknown',
-#         'Alert Triggered (Yes/No)': 'No',
-#         'Caregiver Notified (Yes/No)': 'No'
-#     })
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     return df
-
-# # Clean the datasets
-# health_data = clean_health_data(health_data)
-# safety_data = clean_safety_data(safety_data)
-
-# # Feature Engineering (combine health and safety if needed)
-# # For simplicity, use health data features
-# features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpO₂%)']
-# for feature in features:
-#     if feature in ['Heart Rate', 'Glucose Levels']:
-#         health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-#     elif feature == 'Blood Pressure':
-#         health_data[feature] = health_data[feature].astype(str).apply(lambda x: float(x.split('/')[0]) if '/' in x else 0.0)
-#     else:  # Oxygen Saturation
-#         health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-
-# # Target variable
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# # Split data into features and target
-# X = health_data[features]
-# y = health_data['Caregiver Notified (Yes/No)']
-
-# # Handle missing values in features
-# X = X.fillna(X.mean())
-
-# # Split the data into training and testing sets
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train the Random Forest Classifier
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Predict on test set
-# y_pred = model.predict(X_test)
-
-# # Evaluate the model
-# accuracy = accuracy_score(y_test, y_pred)
-# print(f"\nModel Accuracy: {accuracy:.2f}")
-# print("\nClassification Report:")
-# print(classification_report(y_test, y_pred))
-
-# # Optional: Visualize feature importance
-# importances = model.feature_importances_
-# feature_names = features
-# plt.figure(figsize=(10, 5))
-# plt.bar(feature_names, importances)
-# plt.title('Feature Importance')
-# plt.xlabel('Features')
-# plt.ylabel('Importance')
-# plt.show()
-
-# # Optional: Save the model
-# import joblib
-# joblib.dump(model, 'health_model.pkl')
-
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# from sklearn.metrics import accuracy_score, classification_report
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display raw data for debugging
-# print("Raw Health Monitoring Data (First 5 Rows):")
-# print(health_data.head().to_string())
-# print("\nRaw Safety Monitoring Data (First 5 Rows):")
-# print(safety_data.head().to_string())
-
-# # Data Cleaning for Health Monitoring Data
-# def clean_health_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({'Heart Rate': '0 Yes', 'Glucose Levels': '0 Yes', 'Blood Pressure': '0/0', 'Oxygen Saturation (SpOâ‚‚%)': '0 No',
-#                     'Bel. Alert': 'No', 'Trig': 'No', 'Caregiver Notified (Yes/No)': 'No'})
-    
-#     # Extract numeric values and standardize format
-#     df['Heart Rate'] = df['Heart Rate'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x.replace('/', ' ').split()[0] + '/' + x.replace('/', ' ').split()[1] if '/' in x else '0/0')
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Device-ID/Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     # Validate ranges (optional, adjust thresholds)
-#     df['Heart Rate'] = df.apply(lambda row: row['Heart Rate'] if (int(row['Heart Rate'].split()[0]) <= 200 and int(row['Heart Rate'].split()[0]) >= 30) else '60 Yes', axis=1)
-#     df['Glucose Levels'] = df.apply(lambda row: row['Glucose Levels'] if (int(row['Glucose Levels'].split()[0]) <= 400 and int(row['Glucose Levels'].split()[0]) >= 50) else '100 Yes', axis=1)
-    
-#     return df
-
-# # Data Cleaning for Safety Monitoring Data
-# def clean_safety_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({'Movement': 'No Movem', 'Fall Detect': 'No', 'Impact For Post-Fall': '-', 'Location': '0 Unknown',
-#                     'Alert Trigge': 'No', 'Caregiver Notified (Yes/No)': 'No'})
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Device-ID/Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     return df
-
-# # Clean the datasets
-# health_data = clean_health_data(health_data)
-# safety_data = clean_safety_data(safety_data)
-
-# # Feature Engineering (combine health and safety if needed)
-# # For simplicity, use health data features
-# features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpOâ‚‚%)']
-# for feature in features:
-#     health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-
-# # Target variable
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# # Split data into features and target
-# X = health_data[features]
-# y = health_data['Caregiver Notified (Yes/No)']
-
-# # Handle missing values in features
-# X = X.fillna(X.mean())
-
-# # Split the data into training and testing sets
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train the Random Forest Classifier
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Predict on test set
-# y_pred = model.predict(X_test)
-
-# # Evaluate the model
-# accuracy = accuracy_score(y_test, y_pred)
-# print(f"\nModel Accuracy: {accuracy:.2f}")
-# print("\nClassification Report:")
-# print(classification_report(y_test, y_pred))
-
-# # Optional: Visualize feature importance
-# importances = model.feature_importances_
-# feature_names = features
-# plt.figure(figsize=(10, 5))
-# plt.bar(feature_names, importances)
-# plt.title('Feature Importance')
-# plt.xlabel('Features')
-# plt.ylabel('Importance')
-# plt.show()
-
-# # Optional: Save the model (if needed)
-# import joblib
-# joblib.dump(model, 'health_model.pkl')
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display the first few rows to verify loading
-# print("Health Monitoring Data:")
-# print(health_data.head().to_string())
-# print("\nSafety Monitoring Data:")
-# print(safety_data.head().to_string())
-
-# # Function to check health alerts
-# def check_health_alerts(row):
-#     alert = False
-#     if row['Heart Rate'] != 'No' and int(row['Heart Rate'].split()[0]) > 120:  # Example threshold
-#         alert = True
-#     if row['Glucose L'] != 'No' and int(row['Glucose L'].split()[0]) > 140:  # Example threshold
-#         alert = True
-#     if row['Blood Pres'] != 'No' and any(int(x) > 140 for x in row['Blood Pres'].split()[0].split('/')):  # Example threshold
-#         alert = True
-#     return alert
-
-# # Function to check safety alerts
-# def check_safety_alerts(row):
-#     alert = False
-#     if row['Fall Detect'] == 'Yes' or row['Impact For Post-Fall'] != '-':
-#         alert = True
-#     elif row['Movement'] == 'No Movem' and row['Timestamp'] < pd.Timestamp.now() - pd.Timedelta(hours=12):  # Example inactivity threshold
-#         alert = True
-#     return alert
-
-# # Apply alert checks
-# health_data['Health_Alert'] = health_data.apply(check_health_alerts, axis=1)
-# safety_data['Safety_Alert'] = safety_data.apply(check_safety_alerts, axis=1)
-
-# # Update caregiver notification based on alerts
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Health_Alert'].map({True: 'Yes', False: 'No'})
-# safety_data['Caregiver Notified (Yes/No)'] = safety_data['Safety_Alert'].map({True: 'No', False: 'No'})  # Assuming no prior notifications
-
-# # Display updated data
-# print("\nHealth Monitoring Data with Alerts:")
-# print(health_data)
-# print("\nSafety Monitoring Data with Alerts:")
-# print(safety_data)
-
-# # Optional: Save updated data
-# health_data.to_csv('updated_health_monitoring.csv', index=False)
-# safety_data.to_csv('updated_safety_monitoring.csv', index=False)
-
-# # Open canvas panel for visualization
-# print("\nOpening canvas panel for visualization...")
-# # Convert Timestamp to datetime
-# health_data['Timestamp'] = pd.to_datetime(health_data['Device-ID/Timestamp'].str.extract(r'(\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2})')[0])
-# plt.figure(figsize=(10, 5))
-# plt.plot(health_data['Timestamp'], health_data['Heart Rate'].str.extract(r'(\d+)').astype(float), marker='o')
-# plt.title('Heart Rate Over Time')
-# plt.xlabel('Timestamp')
-# plt.ylabel('Heart Rate')
-# plt.grid()
-# plt.show()
-
-# # [Add your model training code here]
-# # Example: If you want to train a model (e.g., using scikit-learn)
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-
-# # Prepare features and target (example)
-# X = health_data[['Heart Rate', 'Glucose L', 'Blood Pres']].apply(lambda x: x.str.extract(r'(\d+)')[0].astype(float) if x.name != 'Blood Pres' else x.str.extract(r'(\d+)/')[0].astype(float))
-# y = health_data['Health_Alert'].map({'True': 1, 'False': 0})
-
-# # Handle missing values (if any)
-# X = X.fillna(X.mean())
-# y = y.fillna(0)
-
-# # Split data
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train model
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Evaluate
-# accuracy = model.score(X_test, y_test)
-# print(f"\nModel Accuracy: {accuracy}")
-
-
-# import pandas as pd
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# import joblib
-# import os
-
-# # Load dataset (replace with your health_data.xlsx)
-# try:
-#     df = pd.read_excel("health_data.xlsx")
-# except FileNotFoundError:
-#     print("❌ Place 'health_data.xlsx' in the root folder and retry.")
-#     exit(1)
-
-# # Features and target
-# X = df[["heart_rate", "bp_systolic", "bp_diastolic"]]
-# y = df["is_critical"]
-
-# # Split and train
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-# model = RandomForestClassifier()
-# model.fit(X_train, y_train)
-
-# # Save model
-# os.makedirs("models", exist_ok=True)
-# joblib.dump(model, "models/health_model.pkl")
-=======
-import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-import joblib
-
-# Load the datasets
-health_data = pd.read_csv('health_monitoring.csv')
-safety_data = pd.read_csv('safety_monitoring.csv')
-
-# Display raw data for debugging
-print("Raw Health Monitoring Data (First 5 Rows):")
-print(health_data.head().to_string())
-print("\nRaw Safety Monitoring Data (First 5 Rows):")
-print(safety_data.head().to_string())
+    # Extract numeric values and standardize format. Columns left out of a
+    # chunked read (usecols) are skipped.
+    for col in ['Heart Rate', 'Glucose Levels', 'Oxygen Saturation (SpO₂%)']:
+        if col in df:
+            df[col] = parse_measurement(df[col])
+    # Blood Pressure: systolic stays in 'Blood Pressure', diastolic gets its own column
+    if 'Blood Pressure' in df:
+        bp = per_distinct(df['Blood Pressure'].astype(str), _parse_blood_pressure)
+        df['Blood Pressure'] = bp['systolic']
+        df['Blood Pressure (Diastolic)'] = bp['diastolic']
 
-# Data Cleaning for Health Monitoring Data
-def clean_health_data(df):
-    # Fill or drop missing values
-    df = df.fillna({
-        'Heart Rate': '0 Yes',
-        'Glucose Levels': '0 Yes',
-        'Blood Pressure': '0/0',
-        'Oxygen Saturation (SpO₂%)': '0 No',
-        'Alert Triggered (Yes/No)': 'No',
-        'Caregiver Notified (Yes/No)': 'No'
-    })
-    
-    # Extract numeric values and standardize format
-    # Heart Rate: Extract number, validate, and keep as float for now
-    df['Heart Rate'] = df['Heart Rate'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    # Glucose Levels: Same approach
-    df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    # Blood Pressure: Extract systolic (before '/')
-    df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(
-        lambda x: x.split('/')[0] if '/' in x else '0'
-    ).astype(float)
-    # Oxygen Saturation: Extract number
-    df['Oxygen Saturation (SpO₂%)'] = df['Oxygen Saturation (SpO₂%)'].astype(str).apply(
-        lambda x: float(x.split()[0]) if ' ' in x and x.split()[0].replace('.', '', 1).isdigit() else float(x) if x.replace('.', '', 1).isdigit() else 0.0
-    )
-    
     # Convert Timestamp to datetime
-    df['Timestamp'] = pd.to_datetime(
-        df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], 
-        errors='coerce'
-    )
-    
+    if 'Timestamp' in df:
+        df['Timestamp'] = per_distinct(df['Timestamp'], _parse_timestamp)
+
     # Validate ranges
-    df['Heart Rate'] = df['Heart Rate'].apply(
-        lambda x: x if 30 <= x <= 200 else 60.0
-    )
-    df['Glucose Levels'] = df['Glucose Levels'].apply(
-        lambda x: x if 50 <= x <= 400 else 100.0
-    )
-    
+    if 'Heart Rate' in df:
+        df['Heart Rate'] = df['Heart Rate'].where(df['Heart Rate'].between(30, 200), 60.0)
+    if 'Glucose Levels' in df:
+        df['Glucose Levels'] = df['Glucose Levels'].where(df['Glucose Levels'].between(50, 400), 100.0)
+
     return df
 
 # Data Cleaning for Safety Monitoring Data
@@ -530,385 +255,236 @@ def clean_safety_data(df):
         'Alert Triggered (Yes/No)': 'No',
         'Caregiver Notified (Yes/No)': 'No'
     })
-    
+
     # Convert Timestamp to datetime
-    df['Timestamp'] = pd.to_datetime(
-        df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], 
-        errors='coerce'
-    )
-    
+    df['Timestamp'] = per_distinct(df['Timestamp'], _parse_timestamp)
+
     return df
 
-# Clean the datasets
-health_data = clean_health_data(health_data)
-safety_data = clean_safety_data(safety_data)
-
-# Feature Engineering
-features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpO₂%)']
-
-# Target variable
-health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# Split data into features and target
-X = health_data[features]
-y = health_data['Caregiver Notified (Yes/No)']
-
-# Handle missing values in features
-X = X.fillna(X.mean())
-
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Train the Random Forest Classifier
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Predict on test set
-y_pred = model.predict(X_test)
-
-# Evaluate the model
-accuracy = accuracy_score(y_test, y_pred)
-print(f"\nModel Accuracy: {accuracy:.2f}")
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
-
-# Visualize feature importance
-importances = model.feature_importances_
-plt.figure(figsize=(10, 5))
-plt.bar(features, importances)
-plt.title('Feature Importance')
-plt.xlabel('Features')
-plt.ylabel('Importance')
-plt.show()
-
-# Save the model
-joblib.dump(model, 'health_model.pkl')
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# from sklearn.metrics import accuracy_score, classification_report
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display raw data for debugging
-# print("Raw Health Monitoring Data (First 5 Rows):")
-# print(health_data.head().to_string())
-# print("\nRaw Safety Monitoring Data (First 5 Rows):")
-# print(safety_data.head().to_string())
-
-# # Data Cleaning for Health Monitoring Data
-# def clean_health_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({
-#         'Heart Rate': '0 Yes',
-#         'Glucose Levels': '0 Yes',
-#         'Blood Pressure': '0/0',
-#         'Oxygen Saturation (SpO₂%)': '0 No',
-#         'Alert Triggered (Yes/No)': 'No',
-#         'Caregiver Notified (Yes/No)': 'No'
-#     })
-    
-#     # Extract numeric values and standardize format
-#     df['Heart Rate'] = df['Heart Rate'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x.replace('/', ' ').split()[0] + '/' + x.replace('/', ' ').split()[1] if '/' in x else '0/0')
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     # Validate ranges (optional, adjust thresholds)
-#     df['Heart Rate'] = df.apply(lambda row: row['Heart Rate'] if (int(row['Heart Rate'].split()[0]) <= 200 and int(row['Heart Rate'].split()[0]) >= 30) else '60 Yes', axis=1)
-#     df['Glucose Levels'] = df.apply(lambda row: row['Glucose Levels'] if (int(row['Glucose Levels'].split()[0]) <= 400 and int(row['Glucose Levels'].split()[0]) >= 50) else '100 Yes', axis=1)
-    
-#     return df
-
-# # Data Cleaning for Safety Monitoring Data
-# def clean_safety_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({
-#         'Movement Activity': 'No Movem',
-#         'Fall Detected (Yes/No)': 'No',
-#         'Impact Force Level': '-',
-#         'Post-Fall Inactivity Duration (Seconds)': 0,
-#         'Location': '0 Unknown',
-#         'Alert Triggered (Yes/No)': 'No',
-#         'Caregiver Notified (Yes/No)': 'No'
-#     })
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     return df
-
-# # Clean the datasets
-# health_data = clean_health_data(health_data)
-# safety_data = clean_safety_data(safety_data)
-
-# # Feature Engineering (combine health and safety if needed)
-# # For simplicity, use health data features
-# features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpO₂%)']
-# for feature in features:
-#     if feature in ['Heart Rate', 'Glucose Levels']:
-#         health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-#     elif feature == 'Blood Pressure':
-#         health_data[feature] = health_data[feature].astype(str).apply(lambda x: float(x.split('/')[0]) if '/' in x else 0.0)
-#     else:  # Oxygen Saturation
-#         health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-
-# # Target variable
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# # Split data into features and target
-# X = health_data[features]
-# y = health_data['Caregiver Notified (Yes/No)']
-
-# # Handle missing values in features
-# X = X.fillna(X.mean())
-
-# # Split the data into training and testing sets
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train the Random Forest Classifier
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Predict on test set
-# y_pred = model.predict(X_test)
-
-# # Evaluate the model
-# accuracy = accuracy_score(y_test, y_pred)
-# print(f"\nModel Accuracy: {accuracy:.2f}")
-# print("\nClassification Report:")
-# print(classification_report(y_test, y_pred))
-
-# # Optional: Visualize feature importance
-# importances = model.feature_importances_
-# feature_names = features
-# plt.figure(figsize=(10, 5))
-# plt.bar(feature_names, importances)
-# plt.title('Feature Importance')
-# plt.xlabel('Features')
-# plt.ylabel('Importance')
-# plt.show()
-
-# # Optional: Save the model
-# import joblib
-# joblib.dump(model, 'health_model.pkl')
-
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# from sklearn.metrics import accuracy_score, classification_report
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display raw data for debugging
-# print("Raw Health Monitoring Data (First 5 Rows):")
-# print(health_data.head().to_string())
-# print("\nRaw Safety Monitoring Data (First 5 Rows):")
-# print(safety_data.head().to_string())
-
-# # Data Cleaning for Health Monitoring Data
-# def clean_health_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({'Heart Rate': '0 Yes', 'Glucose Levels': '0 Yes', 'Blood Pressure': '0/0', 'Oxygen Saturation (SpOâ‚‚%)': '0 No',
-#                     'Bel. Alert': 'No', 'Trig': 'No', 'Caregiver Notified (Yes/No)': 'No'})
-    
-#     # Extract numeric values and standardize format
-#     df['Heart Rate'] = df['Heart Rate'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Glucose Levels'] = df['Glucose Levels'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x).astype(float).astype(str) + ' Yes'
-#     df['Blood Pressure'] = df['Blood Pressure'].astype(str).apply(lambda x: x.split()[0] if ' ' in x else x.replace('/', ' ').split()[0] + '/' + x.replace('/', ' ').split()[1] if '/' in x else '0/0')
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Device-ID/Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     # Validate ranges (optional, adjust thresholds)
-#     df['Heart Rate'] = df.apply(lambda row: row['Heart Rate'] if (int(row['Heart Rate'].split()[0]) <= 200 and int(row['Heart Rate'].split()[0]) >= 30) else '60 Yes', axis=1)
-#     df['Glucose Levels'] = df.apply(lambda row: row['Glucose Levels'] if (int(row['Glucose Levels'].split()[0]) <= 400 and int(row['Glucose Levels'].split()[0]) >= 50) else '100 Yes', axis=1)
-    
-#     return df
-
-# # Data Cleaning for Safety Monitoring Data
-# def clean_safety_data(df):
-#     # Fill or drop missing values
-#     df = df.fillna({'Movement': 'No Movem', 'Fall Detect': 'No', 'Impact For Post-Fall': '-', 'Location': '0 Unknown',
-#                     'Alert Trigge': 'No', 'Caregiver Notified (Yes/No)': 'No'})
-    
-#     # Convert Timestamp to datetime
-#     df['Timestamp'] = pd.to_datetime(df['Device-ID/Timestamp'].str.extract(r'(\d{1,2}[-/]\d{1,2}[-/]\d{4} \d{1,2}:\d{2})')[0], errors='coerce')
-    
-#     return df
-
-# # Clean the datasets
-# health_data = clean_health_data(health_data)
-# safety_data = clean_safety_data(safety_data)
-
-# # Feature Engineering (combine health and safety if needed)
-# # For simplicity, use health data features
-# features = ['Heart Rate', 'Glucose Levels', 'Blood Pressure', 'Oxygen Saturation (SpOâ‚‚%)']
-# for feature in features:
-#     health_data[feature] = health_data[feature].astype(str).str.extract(r'(\d+)')[0].astype(float)
-
-# # Target variable
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Caregiver Notified (Yes/No)'].map({'Yes': 1, 'No': 0})
-
-# # Split data into features and target
-# X = health_data[features]
-# y = health_data['Caregiver Notified (Yes/No)']
-
-# # Handle missing values in features
-# X = X.fillna(X.mean())
-
-# # Split the data into training and testing sets
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train the Random Forest Classifier
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Predict on test set
-# y_pred = model.predict(X_test)
-
-# # Evaluate the model
-# accuracy = accuracy_score(y_test, y_pred)
-# print(f"\nModel Accuracy: {accuracy:.2f}")
-# print("\nClassification Report:")
-# print(classification_report(y_test, y_pred))
-
-# # Optional: Visualize feature importance
-# importances = model.feature_importances_
-# feature_names = features
-# plt.figure(figsize=(10, 5))
-# plt.bar(feature_names, importances)
-# plt.title('Feature Importance')
-# plt.xlabel('Features')
-# plt.ylabel('Importance')
-# plt.show()
-
-# # Optional: Save the model (if needed)
-# import joblib
-# joblib.dump(model, 'health_model.pkl')
-
-# import pandas as pd
-# import matplotlib.pyplot as plt
-
-# # Load the datasets
-# health_data = pd.read_csv('health_monitoring.csv')
-# safety_data = pd.read_csv('safety_monitoring.csv')
-
-# # Display the first few rows to verify loading
-# print("Health Monitoring Data:")
-# print(health_data.head().to_string())
-# print("\nSafety Monitoring Data:")
-# print(safety_data.head().to_string())
-
-# # Function to check health alerts
-# def check_health_alerts(row):
-#     alert = False
-#     if row['Heart Rate'] != 'No' and int(row['Heart Rate'].split()[0]) > 120:  # Example threshold
-#         alert = True
-#     if row['Glucose L'] != 'No' and int(row['Glucose L'].split()[0]) > 140:  # Example threshold
-#         alert = True
-#     if row['Blood Pres'] != 'No' and any(int(x) > 140 for x in row['Blood Pres'].split()[0].split('/')):  # Example threshold
-#         alert = True
-#     return alert
-
-# # Function to check safety alerts
-# def check_safety_alerts(row):
-#     alert = False
-#     if row['Fall Detect'] == 'Yes' or row['Impact For Post-Fall'] != '-':
-#         alert = True
-#     elif row['Movement'] == 'No Movem' and row['Timestamp'] < pd.Timestamp.now() - pd.Timedelta(hours=12):  # Example inactivity threshold
-#         alert = True
-#     return alert
-
-# # Apply alert checks
-# health_data['Health_Alert'] = health_data.apply(check_health_alerts, axis=1)
-# safety_data['Safety_Alert'] = safety_data.apply(check_safety_alerts, axis=1)
-
-# # Update caregiver notification based on alerts
-# health_data['Caregiver Notified (Yes/No)'] = health_data['Health_Alert'].map({True: 'Yes', False: 'No'})
-# safety_data['Caregiver Notified (Yes/No)'] = safety_data['Safety_Alert'].map({True: 'No', False: 'No'})  # Assuming no prior notifications
-
-# # Display updated data
-# print("\nHealth Monitoring Data with Alerts:")
-# print(health_data)
-# print("\nSafety Monitoring Data with Alerts:")
-# print(safety_data)
-
-# # Optional: Save updated data
-# health_data.to_csv('updated_health_monitoring.csv', index=False)
-# safety_data.to_csv('updated_safety_monitoring.csv', index=False)
-
-# # Open canvas panel for visualization
-# print("\nOpening canvas panel for visualization...")
-# # Convert Timestamp to datetime
-# health_data['Timestamp'] = pd.to_datetime(health_data['Device-ID/Timestamp'].str.extract(r'(\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2})')[0])
-# plt.figure(figsize=(10, 5))
-# plt.plot(health_data['Timestamp'], health_data['Heart Rate'].str.extract(r'(\d+)').astype(float), marker='o')
-# plt.title('Heart Rate Over Time')
-# plt.xlabel('Timestamp')
-# plt.ylabel('Heart Rate')
-# plt.grid()
-# plt.show()
-
-# # [Add your model training code here]
-# # Example: If you want to train a model (e.g., using scikit-learn)
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-
-# # Prepare features and target (example)
-# X = health_data[['Heart Rate', 'Glucose L', 'Blood Pres']].apply(lambda x: x.str.extract(r'(\d+)')[0].astype(float) if x.name != 'Blood Pres' else x.str.extract(r'(\d+)/')[0].astype(float))
-# y = health_data['Health_Alert'].map({'True': 1, 'False': 0})
-
-# # Handle missing values (if any)
-# X = X.fillna(X.mean())
-# y = y.fillna(0)
-
-# # Split data
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Train model
-# model = RandomForestClassifier(n_estimators=100, random_state=42)
-# model.fit(X_train, y_train)
-
-# # Evaluate
-# accuracy = model.score(X_test, y_test)
-# print(f"\nModel Accuracy: {accuracy}")
-
-
-# import pandas as pd
-# from sklearn.ensemble import RandomForestClassifier
-# from sklearn.model_selection import train_test_split
-# import joblib
-# import os
-
-# # Load dataset (replace with your health_data.xlsx)
-# try:
-#     df = pd.read_excel("health_data.xlsx")
-# except FileNotFoundError:
-#     print("❌ Place 'health_data.xlsx' in the root folder and retry.")
-#     exit(1)
-
-# # Features and target
-# X = df[["heart_rate", "bp_systolic", "bp_diastolic"]]
-# y = df["is_critical"]
-
-# # Split and train
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-# model = RandomForestClassifier()
-# model.fit(X_train, y_train)
-
-# # Save model
-# os.makedirs("models", exist_ok=True)
-# joblib.dump(model, "models/health_model.pkl")
->>>>>>> 7390bf1e558969d04af97332ef20225c025a40de
-# print(f"✅ Model trained and saved. Accuracy on test set: {model.score(X_test, y_test):.2f}")
\ No newline at end of file
+def load(path='health_monitoring.csv', sample_rows=SAMPLE_ROWS, chunksize=CHUNKSIZE, cache=True, trend_window=None):
+    # Cleaned features and target, down-sampled to at most sample_rows rows
+    return sample_chunks(iter_health_chunks(path, chunksize, cache, trend_window), sample_rows)
+
+def train(X, y, n_estimators=100, n_jobs=None, random_state=42, **params):
+    model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=n_jobs, random_state=random_state, **params)
+    model.fit(X, y)
+    # Serving scores a handful of readings at a time, where a thread pool per
+    # predict() costs more than it saves
+    model.set_params(n_jobs=None)
+    return model
+
+def summarize(counts):
+    # Metrics for the "caregiver notified" class from a 2x2 confusion matrix
+    (tn, fp), (fn, tp) = counts
+    total = int(counts.sum())
+    return {
+        'accuracy': (tp + tn) / max(total, 1),
+        'precision': tp / max(tp + fp, 1),
+        'recall': tp / max(tp + fn, 1),
+        'support': total,
+    }
+
+def evaluate(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    metrics = summarize(confusion_matrix(y_test, y_pred, labels=[0, 1]))
+    metrics['report'] = classification_report(y_test, y_pred)
+    return metrics
+
+def plot_feature_importance(model, path):
+    # Rendered straight to a file (no pyplot, no display), so training runs headless
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.bar(list(model.feature_names_in_), model.feature_importances_)
+    ax.tick_params(axis='x', labelrotation=90)
+    ax.set_title('Feature Importance')
+    ax.set_xlabel('Features')
+    ax.set_ylabel('Importance')
+    fig.savefig(path, bbox_inches='tight')
+
+def save_model(model, path, schema=HEALTH_FEATURES):
+    # Written beside the target and renamed into place, so an agent starting
+    # meanwhile never loads a half-written model. The feature schema goes
+    # alongside (health_model.features.json), and forests are also exported as
+    # memory-mappable arrays (health_model/), which HealthAgent prefers.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+    schema.save(schema_path(path))
+    if hasattr(model, 'estimators_'):
+        export_forest(model, compact_path(path))
+    else:
+        shutil.rmtree(compact_path(path), ignore_errors=True)
+
+# Search space for --search. Forest size and depth drive inference latency,
+# class weights trade precision for recall on the minority class.
+SEARCH_SPACE = {
+    'n_estimators': [10, 25, 50, 100, 200],
+    'max_depth': [None, 4, 8, 12, 16],
+    'class_weight': [None, 'balanced', 'balanced_subsample'],
+}
+SEARCH_FILE = 'health_model_search.json'
+
+def predict_latency(model, X, calls=200):
+    # Median milliseconds for one single-reading predict(), the way
+    # HealthAgent.monitor_health calls the model
+    row = np.ascontiguousarray(X.iloc[:1].to_numpy())
+    times = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)  # fitted with feature names, called without
+        model.predict(row)
+        for _ in range(calls):
+            start = time.perf_counter()
+            model.predict(row)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+def _cross_validate(params, X, y, folds, seed, deadline):
+    # One candidate on one rung; skipped when the budget ran out while it was queued
+    if time.monotonic() > deadline:
+        return None
+    counts = np.zeros((2, 2), dtype=np.int64)
+    for train_idx, test_idx in folds:
+        model = RandomForestClassifier(random_state=seed, **params).fit(X.iloc[train_idx], y.iloc[train_idx])
+        counts += confusion_matrix(y.iloc[test_idx], model.predict(X.iloc[test_idx]), labels=[0, 1])
+    metrics = summarize(counts)
+    # Measured alongside other workers, so only a rough ranking; finalists are re-timed alone
+    metrics['latency_ms'] = predict_latency(model, X, calls=50)
+    return metrics
+
+def _rank(metrics, min_recall):
+    return (metrics['recall'] >= min_recall, metrics['accuracy'], metrics['recall'])
+
+def search(X_train, y_train, X_test, y_test, min_recall=0.9, budget=300, candidates=24, n_jobs=-1,
+           cv=3, eta=3, finalists=3, min_rows=1000, seed=42):
+    # Successive halving: every candidate is cross-validated on a small
+    # sample, the best 1/eta move on to eta times more rows, until `finalists`
+    # remain or the data runs out. Candidates and folds run in parallel, and
+    # nothing new starts once `budget` seconds have passed. Finalists are then
+    # fitted on the full training set, scored on the test set and timed, and
+    # the fastest one that meets min_recall wins.
+    deadline = time.monotonic() + budget
+    space = list(ParameterSampler(SEARCH_SPACE, candidates, random_state=seed))
+    report = [{'params': params, 'rows': 0, 'cv': None} for params in space]
+    order = np.random.default_rng(seed).permutation(len(X_train))
+    rungs = max(0, int(np.ceil(np.log(max(len(space) / finalists, 1)) / np.log(eta))))
+    rows = max(min_rows, len(X_train) // eta ** rungs)
+    alive = list(range(len(space)))
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        while True:
+            rows = min(rows, len(X_train))
+            X, y = X_train.iloc[order[:rows]], y_train.iloc[order[:rows]]
+            folds = list(StratifiedKFold(cv, shuffle=True, random_state=seed).split(X, y))
+            results = parallel(delayed(_cross_validate)(space[i], X, y, folds, seed, deadline) for i in alive)
+            scored = [i for i, metrics in zip(alive, results) if metrics is not None]
+            for i, metrics in zip(alive, results):
+                if metrics is not None:
+                    report[i].update(rows=rows, cv=metrics)
+            print(f"🔎 {len(scored)}/{len(alive)} candidates scored on {rows} rows")
+            if scored:
+                alive = sorted(scored, key=lambda i: _rank(report[i]['cv'], min_recall), reverse=True)
+            if not scored or time.monotonic() > deadline or rows >= len(X_train) or len(alive) <= finalists:
+                break
+            alive = alive[:max(finalists, len(alive) // eta)]
+            rows *= eta
+
+    models = {}
+    for i in alive[:finalists]:
+        models[i] = train(X_train, y_train, n_jobs=n_jobs, random_state=seed, **space[i])
+        report[i]['test'] = evaluate(models[i], X_test, y_test)
+        report[i]['test'].pop('report')
+        report[i]['test']['latency_ms'] = predict_latency(models[i], X_test)
+    if not models:
+        raise RuntimeError("search budget ran out before any candidate was scored")
+
+    meeting = [i for i in models if report[i]['test']['recall'] >= min_recall]
+    if meeting:
+        best = min(meeting, key=lambda i: report[i]['test']['latency_ms'])
+    else:
+        # Best recall, the faster model on a tie
+        best = max(models, key=lambda i: (report[i]['test']['recall'], -report[i]['test']['latency_ms']))
+    report[best]['chosen'] = True
+    return models[best], report
+
+def print_search_report(report, min_recall):
+    print(f"\n{'n_est':>5} {'depth':>5} {'class_weight':>18} {'rows':>6} {'cv acc':>6} {'cv rec':>6} "
+          f"{'cv ms':>6} {'test acc':>8} {'test rec':>8} {'test ms':>7}")
+    for entry in sorted(report, key=lambda e: (-e['rows'], e['cv']['latency_ms'] if e['cv'] else 0)):
+        params, cv, test = entry['params'], entry['cv'], entry.get('test')
+        line = (f"{params['n_estimators']:>5} {str(params['max_depth']):>5} {str(params['class_weight']):>18} "
+                f"{entry['rows']:>6} ")
+        line += f"{cv['accuracy']:>6.3f} {cv['recall']:>6.3f} {cv['latency_ms']:>6.2f}" if cv else f"{'-':>6} {'-':>6} {'-':>6}"
+        if test:
+            line += f" {test['accuracy']:>8.3f} {test['recall']:>8.3f} {test['latency_ms']:>7.2f}"
+        if entry.get('chosen') and test['recall'] >= min_recall:
+            line += f"  ✅ fastest with recall >= {min_recall}"
+        elif entry.get('chosen'):
+            line += "  ⚠️ best recall, below target"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the health alert model")
+    parser.add_argument("--health-csv", default="health_monitoring.csv")
+    parser.add_argument("--safety-csv", default="safety_monitoring.csv")
+    parser.add_argument("--output-dir", default=".",
+                        help=f"where {MODEL_FILE}, {PLOT_FILE} and {METRICS_FILE} are written")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores used to fit the forest (-1: all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="CSV rows read and cleaned at a time")
+    parser.add_argument("--sample-rows", type=int, default=SAMPLE_ROWS,
+                        help="train the forest on a uniform sample of at most this many rows")
+    parser.add_argument("--incremental", action="store_true",
+                        help="stream every row into a linear model instead of sampling for the forest")
+    parser.add_argument("--no-cache", action="store_true", help="re-clean the CSV instead of reusing cleaned data")
+    parser.add_argument("--search", action="store_true",
+                        help="tune the forest by successive halving and keep the fastest model meeting --min-recall")
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--budget", type=float, default=300, help="seconds the search may spend on candidates")
+    parser.add_argument("--candidates", type=int, default=24, help="configurations sampled from SEARCH_SPACE")
+    parser.add_argument("--cv", type=int, default=3, help="cross-validation folds per candidate")
+    parser.add_argument("--trend-window", type=float, default=0,
+                        help="minutes of per-device history behind rolling trend features (0: none)")
+    args = parser.parse_args(argv)
+    cache = not args.no_cache
+    trend_window = args.trend_window or None
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Display raw data for debugging
+    print("Raw Health Monitoring Data (First 5 Rows):")
+    print(pd.read_csv(args.health_csv, nrows=5).to_string())
+    print("\nRaw Safety Monitoring Data (First 5 Rows):")
+    print(pd.read_csv(args.safety_csv, nrows=5).to_string())
+
+    if args.incremental:
+        model, counts = train_incremental(args.health_csv, args.chunksize, cache=cache, trend_window=trend_window)
+        metrics = summarize(counts)
+    else:
+        # Clean chunk by chunk, keeping a bounded sample for the forest
+        X, y = load(args.health_csv, args.sample_rows, args.chunksize, cache, trend_window)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=args.seed)
+        if args.search:
+            model, report = search(X_train, y_train, X_test, y_test, args.min_recall, args.budget,
+                                   args.candidates, args.n_jobs, args.cv, seed=args.seed)
+            print_search_report(report, args.min_recall)
+            with open(os.path.join(args.output_dir, SEARCH_FILE), 'w') as f:
+                json.dump(report, f, indent=2)
+        else:
+            model = train(X_train, y_train, args.n_estimators, args.n_jobs, args.seed)
+        metrics = evaluate(model, X_test, y_test)
+        plot_feature_importance(model, os.path.join(args.output_dir, PLOT_FILE))
+
+    print(f"\nModel Accuracy: {metrics['accuracy']:.2f}")
+    print(f"Recall: {metrics['recall']:.2f}  Precision: {metrics['precision']:.2f}  "
+          f"(held-out rows: {metrics['support']})")
+    if 'report' in metrics:
+        print("\nClassification Report:")
+        print(metrics['report'])
+
+    save_model(model, os.path.join(args.output_dir, MODEL_FILE), health_schema(trend_window))
+    with open(os.path.join(args.output_dir, METRICS_FILE), 'w') as f:
+        json.dump({k: v for k, v in metrics.items() if k != 'report'}, f, indent=2)
+    print(f"💾 Saved the model and {METRICS_FILE} to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
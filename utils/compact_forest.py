@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import shutil
+import numpy as np
+
+# A trained scikit-learn forest flattened into a directory of .npy node arrays
+# (all trees back to back) that np.load memory-maps: loading takes
+# milliseconds, and every process serving the same model shares the pages
+# through the OS page cache instead of unpickling its own copy.
+ARRAYS = ("feature", "threshold", "children", "value", "roots", "classes")
+
+def export_forest(model, directory):
+    # Write `model` (RandomForestClassifier / ExtraTreesClassifier) to `directory`,
+    # replacing any previous export in one rename
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    # Node ids become positions in the combined arrays. children[i] holds the
+    # (left, right) successors of node i; a successor that is a leaf is stored
+    # as ~id (negative), so the walk knows it has arrived without another lookup.
+    children = np.concatenate([
+        np.stack([tree.children_left, tree.children_right], axis=1) + start
+        for tree, start in zip(trees, offsets[:-1])
+    ])
+    is_leaf = np.concatenate([tree.children_left < 0 for tree in trees])
+    children[is_leaf] = 0  # leaves have no successors; never followed
+    children = np.where(is_leaf[children], ~children, children)
+    roots = offsets[:-1]
+    roots = np.where(is_leaf[roots], ~roots, roots)
+    arrays = {
+        "feature": np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+        "threshold": np.concatenate([tree.threshold for tree in trees]),
+        "children": children.astype(np.int32),
+        # Per-node class fractions, as the trees' predict_proba returns them
+        "value": np.concatenate([tree.value[:, 0, :] for tree in trees]),
+        "roots": roots.astype(np.int32),
+        "classes": np.asarray(model.classes_),
+    }
+    meta = {
+        "n_features": int(model.n_features_in_),
+        "n_trees": len(trees),
+        "feature_names": [str(name) for name in getattr(model, "feature_names_in_", [])],
+    }
+
+    tmp = f"{directory.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    # Processes that mapped the old files keep reading them until they reload
+    old = f"{tmp}.old"
+    if os.path.exists(directory):
+        os.replace(directory, old)
+    os.replace(tmp, directory)
+    shutil.rmtree(old, ignore_errors=True)
+
+class CompactForest:
+    # Pure-NumPy predictor for an exported forest; predict/predict_proba agree
+    # with the original scikit-learn model
+    def __init__(self, directory):
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.n_features_in_ = self.meta["n_features"]
+        self.classes_ = np.asarray(self.classes)
+
+    def apply(self, X):
+        # Leaf reached by every (sample, tree) pair. All pairs walk down
+        # together one level per step, and pairs that reached a leaf drop out.
+        # Like scikit-learn, features are compared as float32.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"expected X of shape (n, {self.n_features_in_}), got {X.shape}")
+        if np.isnan(X).any():
+            raise ValueError("X contains NaN")
+        n, n_trees = len(X), len(self.roots)
+        flat_X = X.ravel()
+        feature, threshold = np.asarray(self.feature), np.asarray(self.threshold)
+        successors = np.asarray(self.children).ravel()
+        base = np.repeat(np.arange(n, dtype=np.intp) * X.shape[1], n_trees)
+        node = np.tile(np.asarray(self.roots), n)
+        active = np.flatnonzero(node >= 0)
+        while active.size:
+            current = node[active]
+            go_right = flat_X[base[active] + feature[current]] > threshold[current]
+            current = successors[2 * current + go_right]
+            node[active] = current
+            active = active[current >= 0]
+        return (~node).reshape(n, n_trees)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # Summed tree by tree, in order, then averaged, as the forest does
+        proba = np.zeros((len(leaves), self.value.shape[1]))
+        value = np.asarray(self.value)
+        for t in range(leaves.shape[1]):
+            proba += value[leaves[:, t]]
+        return proba / leaves.shape[1]
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+def compact_path(model_path):
+    # "health_model.pkl" -> "health_model"
+    return os.path.splitext(model_path)[0]
+
+def load_model(model_path):
+    # The compact export next to a pickled model when there is one at least as
+    # new as the pickle, otherwise the pickle itself
+    meta = os.path.join(compact_path(model_path), "meta.json")
+    if os.path.exists(meta) and (not os.path.exists(model_path)
+                                 or os.path.getmtime(meta) >= os.path.getmtime(model_path)):
+        return CompactForest(compact_path(model_path))
+    import joblib
+    return joblib.load(model_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a pickled forest to memory-mappable arrays")
+    parser.add_argument("model", nargs="?", default="health_model.pkl")
+    parser.add_argument("directory", nargs="?", help="defaults to the model path without its extension")
+    args = parser.parse_args()
+    import joblib
+    directory = args.directory or compact_path(args.model)
+    export_forest(joblib.load(args.model), directory)
+    print(f"Exported {args.model} to {directory}/")
@@ -0,0 +1,160 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB = "db/memory.sqlite"
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers never block the writer and vice versa
+    "PRAGMA synchronous=NORMAL",    # fsync at checkpoints only; safe with WAL
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",     # 16 MB page cache
+)
+
+_local = threading.local()
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB):
+    # One tuned connection per (thread, database), reused across calls.
+    # sqlite3 connections must not be shared between threads, so reads go
+    # through here and writes go through the shared writer below.
+    conns = _local.__dict__.setdefault("conns", {})
+    key = os.path.abspath(db_path)
+    conn = conns.get(key)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=5)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conns[key] = conn
+    return conn
+
+
+def add_column(conn, table, column, decl):
+    # Idempotent ALTER TABLE for tables created before a column existed
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+class GroupCommitWriter:
+    # Single writer thread per database. Statements submitted by any agent are
+    # queued and committed together every `interval` seconds or `max_batch`
+    # statements, so N inserts cost one fsync instead of N and writers never
+    # contend for the database lock.
+    def __init__(self, db_path=DEFAULT_DB, interval=0.05, max_batch=5000):
+        self.db_path = db_path
+        self.interval = interval
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.stats = {"statements": 0, "commits": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name=f"db-writer:{db_path}", daemon=True)
+        self._thread.start()
+
+    def execute(self, sql, params=()):
+        self.queue.put(("execute", sql, params))
+
+    def executemany(self, sql, rows):
+        self.queue.put(("executemany", sql, rows))
+
+    def transaction(self, statements):
+        # (sql, params) pairs committed all-or-nothing, in the same group
+        # commit: if one fails, none of them is applied
+        self.queue.put(("transaction", list(statements), None))
+
+    def flush(self, timeout=None):
+        # Block until everything submitted so far is committed
+        done = threading.Event()
+        self.queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self._thread.join()
+        with _writers_lock:
+            if _writers.get(os.path.abspath(self.db_path)) is self:
+                del _writers[os.path.abspath(self.db_path)]
+
+    def _run(self):
+        conn = connect(self.db_path)
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            # A flush or close request ends the window early instead of waiting it out
+            while len(batch) < self.max_batch and batch[-1] is not None and batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            waiters = []
+            try:
+                with conn:
+                    for item in batch:
+                        if item is None:
+                            running = False
+                            continue
+                        op, sql, params = item
+                        if op == "flush":
+                            waiters.append(sql)
+                            continue
+                        try:
+                            self._savepoint(conn, op, sql, params)
+                            self.stats["statements"] += 1
+                        except sqlite3.Error as e:
+                            # A bad statement must not take the rest of the group down with it
+                            self.stats["errors"] += 1
+                            print(f"❌ DB write failed: {e}")
+                self.stats["commits"] += 1
+            except Exception as e:
+                # The commit itself failed and the group was rolled back; keep
+                # the writer alive and release the waiters all the same
+                self.stats["errors"] += 1
+                print(f"❌ DB commit failed: {e}")
+            finally:
+                for done in waiters:
+                    done.set()
+
+    @staticmethod
+    def _savepoint(conn, op, sql, params):
+        # Each queued item runs in a savepoint inside the group's transaction
+        # and is rolled back on failure, so a transaction or an executemany
+        # is applied whole or not at all
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT group_item")
+        try:
+            if op == "transaction":
+                for statement, values in sql:
+                    conn.execute(statement, values)
+            else:
+                getattr(conn, op)(sql, params)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK TO group_item")
+            raise
+        finally:
+            conn.execute("RELEASE group_item")
+
+
+def get_writer(db_path=DEFAULT_DB):
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = GroupCommitWriter(db_path)
+        return writer
+
+
+@atexit.register
+def flush_all():
+    for writer in list(_writers.values()):
+        writer.flush(timeout=5)
@@ -0,0 +1,101 @@
+import json
+import os
+import numpy as np
+
+# The feature contract between training and serving: which inputs the model
+# takes, in what order and type, and which values are plausible. Training
+# saves the schema it used next to the model, and HealthAgent refuses to load
+# a model whose schema differs from what it feeds.
+SCHEMA_VERSION = 1
+
+class Feature:
+    def __init__(self, name, column, low, high, dtype="float32"):
+        self.name = name        # serving name (IoT payload field, DataFrame column)
+        self.column = column    # training CSV column after cleaning
+        self.low = low
+        self.high = high
+        self.dtype = dtype
+
+    def to_dict(self):
+        return {"name": self.name, "column": self.column, "low": self.low, "high": self.high, "dtype": self.dtype}
+
+class FeatureSchema:
+    def __init__(self, features, version=SCHEMA_VERSION, trend_window=None):
+        self.features = list(features)
+        self.version = version
+        # Minutes of history behind the trend features (utils/rolling.py), if any
+        self.trend_window = trend_window
+        self.names = [f.name for f in self.features]
+        self.columns = [f.column for f in self.features]
+        self.dtype = np.dtype(self.features[0].dtype)
+        if any(np.dtype(f.dtype) != self.dtype for f in self.features):
+            raise ValueError("all features must share one dtype")
+        self._low = np.array([f.low for f in self.features], dtype=self.dtype)
+        self._high = np.array([f.high for f in self.features], dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.features)
+
+    def to_dict(self):
+        return {"version": self.version, "trend_window": self.trend_window,
+                "features": [f.to_dict() for f in self.features]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([Feature(**f) for f in data["features"]], data["version"], data.get("trend_window"))
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def check(self, other):
+        # Raise if a model trained with `other` cannot be fed by this schema
+        if self.to_dict() != other.to_dict():
+            raise ValueError(f"feature schema mismatch: model expects "
+                             f"{[(f.name, f.dtype, f.low, f.high) for f in other.features]} "
+                             f"(v{other.version}, trend window {other.trend_window}), serving provides "
+                             f"{[(f.name, f.dtype, f.low, f.high) for f in self.features]} "
+                             f"(v{self.version}, trend window {self.trend_window})")
+
+    def valid(self, X):
+        # Row mask: every value finite and inside its feature's range
+        return ((X >= self._low) & (X <= self._high)).all(axis=1)
+
+    def build(self, data, validate=True):
+        # Contiguous (n, len(self)) array in schema order and dtype, from an
+        # array already in that order or a DataFrame with serving names or
+        # training columns. With validate, implausible values raise.
+        if hasattr(data, "columns"):
+            data = data[self.names if set(self.names) <= set(data.columns) else self.columns]
+            X = data.to_numpy(dtype=self.dtype)
+        else:
+            X = np.asarray(data, dtype=self.dtype)
+        X = np.ascontiguousarray(X)
+        if X.ndim != 2 or X.shape[1] != len(self):
+            raise ValueError(f"expected readings of shape (n, {len(self)}) for {self.names}, got {X.shape}")
+        if validate:
+            ok = self.valid(X)
+            if not ok.all():
+                row = int(np.flatnonzero(~ok)[0])
+                raise ValueError(f"{int((~ok).sum())} readings outside the valid ranges, first: "
+                                 f"{dict(zip(self.names, X[row].tolist()))}")
+        return X
+
+def schema_path(model_path):
+    # "health_model.pkl" -> "health_model.features.json"
+    return f"{os.path.splitext(model_path)[0]}.features.json"
+
+# Vitals a resident's device reports, in the order the health model sees them
+HEALTH_FEATURES = FeatureSchema([
+    Feature("heart_rate", "Heart Rate", 20, 250),
+    Feature("bp_systolic", "Blood Pressure", 50, 260),
+    Feature("bp_diastolic", "Blood Pressure (Diastolic)", 30, 160),
+    Feature("spo2", "Oxygen Saturation (SpO₂%)", 50, 100),
+])
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow as pa
+except ImportError:  # the cache is only a speed-up; without pyarrow every run parses the CSV
+    pa = None
+
+# Cleaned training frames are kept as uncompressed Feather (Arrow IPC) files,
+# keyed by a hash of the source file and of whatever shapes the cleaned output
+# (cleaning-code version, columns), so a rerun memory-maps them instead of
+# parsing the CSV again.
+CACHE_DIR = "data/cache"
+# Bump when the layout of the cache files changes (2: row labels are stored)
+FORMAT_VERSION = 2
+
+def file_digest(path, cache_dir=CACHE_DIR):
+    # sha256 of the file contents, remembered per (size, mtime) so an unchanged
+    # multi-GB export is not re-hashed on every run
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, "digests.json")
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        index = {}
+    source = os.path.abspath(path)
+    entry = index.get(source)
+    if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return entry[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    index[source] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
+    return index[source][2]
+
+def cache_path(source, name, version, cache_dir=CACHE_DIR):
+    key = hashlib.sha256(f"{file_digest(source, cache_dir)}\0{FORMAT_VERSION}\0{version}".encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{_prefix(source, name)}{key}.feather")
+
+def _prefix(source, name):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f"{name}-{stem}-"
+
+def cached_chunks(source, name, version, produce, cache_dir=CACHE_DIR):
+    # Yield the DataFrame chunks of produce() (cleaned chunks of `source`),
+    # from the cache when a file for this source and version exists, otherwise
+    # by running produce() and recording its chunks on the way through. A run
+    # abandoned part way leaves no cache file behind.
+    if pa is None:
+        yield from produce()
+        return
+    path = cache_path(source, name, version, cache_dir)
+    if os.path.exists(path):
+        yield from read_chunks(path)
+        return
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = None
+    try:
+        for chunk in produce():
+            batch = pa.RecordBatch.from_pandas(chunk, preserve_index=True)
+            if writer is None:
+                writer = pa.ipc.new_file(tmp, batch.schema)
+            writer.write_batch(batch)
+            yield chunk
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp, path)
+            prune(_prefix(source, name), keep=path, cache_dir=cache_dir)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def read_chunks(path):
+    # Batches come straight out of the memory-mapped file, with the row labels
+    # produce() gave them (source row numbers, gaps where rows were dropped)
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
+
+def prune(prefix, keep, cache_dir=CACHE_DIR):
+    # Entries for older versions of the same source are never read again
+    for entry in os.scandir(cache_dir):
+        if entry.name.startswith(prefix) and entry.name.endswith(".feather") and entry.path != keep:
+            os.remove(entry.path)
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import heapq
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+
+import requests
+
+from utils.db import connect, get_writer
+
+# Transactional outbox for notifications. FamilyAgent writes one outbox row
+# per (recipient, notification) in the same transaction as the alert it
+# belongs to, and OutboxDispatcher delivers pending rows in the background:
+# agents never wait on SMTP or a webhook, and a crash between the two loses
+# nothing. Delivery is at-least-once; every attempt carries the row's
+# idempotency key so the receiving end can drop repeats.
+INSERT_OUTBOX = """
+    INSERT OR IGNORE INTO outbox (idempotency_key, channel, recipient, subject, body, created)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+def create_outbox(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            channel TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            created TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL DEFAULT 0,
+            delivered TEXT,
+            last_error TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (status, id)")
+    conn.commit()
+
+def idempotency_key(*parts):
+    # Stable key for one notification to one recipient
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+def outbox_row(key, channel, recipient, subject, body):
+    return INSERT_OUTBOX, (key, channel, recipient, subject, body, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+class DeliveryRejected(Exception):
+    # The receiver refused the message for good; retrying will not help
+    pass
+
+class Channel:
+    # A delivery channel with at most `concurrency` sends in flight. Sends are
+    # blocking client calls, run on the channel's own threads.
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.limit = asyncio.Semaphore(concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=type(self).__name__)
+        self._local = threading.local()
+
+    async def send(self, recipient, subject, body, key):
+        async with self.limit:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.deliver, recipient, subject, body, key)
+
+    def deliver(self, recipient, subject, body, key):
+        raise NotImplementedError
+
+class WebhookChannel(Channel):
+    # POSTs {"recipient", "subject", "body"} as JSON with an Idempotency-Key
+    # header; 4xx other than 408/429 is permanent, anything else is retried
+    def __init__(self, url, concurrency=16, timeout=10):
+        super().__init__(concurrency)
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, recipient, subject, body, key):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.post(self.url, json={"recipient": recipient, "subject": subject, "body": body},
+                                headers={"Idempotency-Key": key}, timeout=self.timeout)
+        if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+            raise DeliveryRejected(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+class SmtpChannel(Channel):
+    # Plain SMTP; each worker thread keeps its connection open between
+    # messages. The idempotency key becomes the Message-ID.
+    def __init__(self, host, port=25, sender="alerts@carevibe.ai", concurrency=4, timeout=10):
+        super().__init__(concurrency)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def deliver(self, recipient, subject, body, key):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message["Message-ID"] = f"<{key}@carevibe.ai>"
+        message.set_content(body)
+        for attempt in range(2):
+            smtp = getattr(self._local, "smtp", None)
+            if smtp is None:
+                smtp = self._local.smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                smtp.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Idle connection closed by the server; reconnect once
+                self._local.smtp = None
+                if attempt:
+                    raise
+            except smtplib.SMTPRecipientsRefused as e:
+                raise DeliveryRejected(str(e))
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    raise DeliveryRejected(f"SMTP {e.smtp_code}")
+                raise
+
+class OutboxDispatcher:
+    # Delivers pending outbox rows through `channels` (name -> Channel). New
+    # rows are picked up by id like ReminderAgent.sync; failed sends are
+    # retried with exponential backoff and jitter until max_attempts, and
+    # every outcome is written back through the group-commit writer.
+    def __init__(self, db_path="db/memory.sqlite", channels=None, poll_interval=0.5,
+                 max_attempts=8, backoff=2.0, max_backoff=15 * 60):
+        self.db_path = db_path
+        create_outbox(connect(db_path))
+        self.writer = get_writer(db_path)
+        self.channels = channels or {}
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.messages = {}  # id -> [key, channel, recipient, subject, body, attempts]
+        self.due = []       # min-heap of (next_attempt, id)
+        self.last_id = 0
+        self.stats = {"delivered": 0, "retried": 0, "failed": 0}
+
+    def sync(self):
+        # Pending rows added since the last sync, including a backlog left
+        # over from a previous run
+        rows = connect(self.db_path).execute(
+            "SELECT id, idempotency_key, channel, recipient, subject, body, attempts, next_attempt "
+            "FROM outbox WHERE status = 'pending' AND id > ? ORDER BY id", (self.last_id,)).fetchall()
+        for mid, key, channel, recipient, subject, body, attempts, next_attempt in rows:
+            self.messages[mid] = [key, channel, recipient, subject, body, attempts]
+            heapq.heappush(self.due, (next_attempt, mid))
+        if rows:
+            self.last_id = rows[-1][0]
+        return len(rows)
+
+    def pending(self):
+        return len(self.messages)
+
+    async def run(self, stop=None):
+        # Deliver until `stop` (an asyncio.Event) is set and nothing is left in flight
+        tasks = set()
+        while stop is None or not stop.is_set() or tasks:
+            self.sync()
+            now = time.time()
+            while self.due and self.due[0][0] <= now:
+                _, mid = heapq.heappop(self.due)
+                task = asyncio.create_task(self._deliver(mid))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            wait = self.poll_interval if not self.due else min(self.poll_interval, self.due[0][0] - now)
+            await asyncio.sleep(max(wait, 0.001))
+
+    async def _deliver(self, mid):
+        message = self.messages[mid]
+        key, channel_name, recipient, subject, body, attempts = message
+        channel = self.channels.get(channel_name)
+        permanent = channel is None
+        error = f"no channel {channel_name!r}" if permanent else None
+        if channel is not None:
+            try:
+                await channel.send(recipient, subject, body, key)
+            except DeliveryRejected as e:
+                error, permanent = str(e) or type(e).__name__, True
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        attempts += 1
+        now = time.time()
+        if error is None:
+            del self.messages[mid]
+            self.stats["delivered"] += 1
+            self.writer.execute("UPDATE outbox SET status = 'delivered', attempts = ?, delivered = ?, "
+                                "last_error = NULL WHERE id = ?",
+                                (attempts, datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"), mid))
+        elif permanent or attempts >= self.max_attempts:
+            del self.messages[mid]
+            self.stats["failed"] += 1
+            print(f"❌ {channel_name} delivery to {recipient} failed after {attempts} attempts: {error}")
+            self.writer.execute("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                                (attempts, error, mid))
+        else:
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+            message[5] = attempts
+            heapq.heappush(self.due, (now + delay, mid))
+            self.stats["retried"] += 1
+            self.writer.execute("UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                                (attempts, now + delay, error, mid))
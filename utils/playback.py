@@ -0,0 +1,143 @@
+import heapq
+import itertools
+import platform
+import subprocess
+import threading
+import time
+
+# Lower plays first; a queued item preempts anything playing at a higher number
+PRIORITY_ALERT = 0
+PRIORITY_REMINDER = 1
+PRIORITY_SOCIAL = 2
+
+
+class PlaybackBackend:
+    # play(path) starts playback and returns a handle with done() and stop()
+    def play(self, path):
+        raise NotImplementedError
+
+
+class _ProcessHandle:
+    def __init__(self, process):
+        self.process = process
+
+    def done(self):
+        return self.process.poll() is not None
+
+    def stop(self):
+        self.process.terminate()
+
+
+class SubprocessBackend(PlaybackBackend):
+    # Local command-line player; each utterance gets its own process
+    def command(self, path):
+        system = platform.system()
+        if system == "Windows":
+            return ["cmd", "/c", "start", "/wait", "", path]
+        if system == "Darwin":
+            return ["afplay", path]
+        return ["mpg123", "-q", path]
+
+    def play(self, path):
+        return _ProcessHandle(subprocess.Popen(self.command(path), stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL))
+
+
+class _TimedHandle:
+    def __init__(self, duration):
+        self.end = time.monotonic() + duration
+        self.stopped = False
+
+    def done(self):
+        return self.stopped or time.monotonic() >= self.end
+
+    def stop(self):
+        self.stopped = True
+
+
+class NullBackend(PlaybackBackend):
+    # Plays nothing; for headless servers and tests
+    def play(self, path):
+        return _TimedHandle(0)
+
+
+class RecordingBackend(PlaybackBackend):
+    # Records what would have played and when; `duration` simulates play time
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.played = []
+
+    def play(self, path):
+        self.played.append((time.monotonic(), path))
+        return _TimedHandle(self.duration)
+
+
+class PlaybackQueue:
+    # One worker thread synthesizes and plays queued utterances in priority
+    # order, so callers return as soon as they enqueue. If something more
+    # urgent is queued while a lower-priority utterance plays, playback is cut
+    # short, the urgent one plays next and the interrupted one is requeued in
+    # its original place to play again from the start.
+    def __init__(self, backend, synthesize):
+        self.backend = backend
+        self.synthesize = synthesize
+        self.stats = {"played": 0, "preempted": 0, "errors": 0}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tts-playback", daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, text, lang, priority=PRIORITY_REMINDER):
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), text, lang))
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        # Block until the queue is empty and nothing is playing
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                item = heapq.heappop(self._heap)
+                self._busy = True
+            priority, _, text, lang = item
+            try:
+                if not self._play(priority, text, lang):
+                    with self._cond:
+                        heapq.heappush(self._heap, item)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Speech failed [{lang}] {text}: {e}")
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _play(self, priority, text, lang):
+        # False if cut short by something more urgent
+        handle = self.backend.play(self.synthesize(text, lang))
+        while not handle.done():
+            with self._cond:
+                if self._heap and self._heap[0][0] < priority:
+                    handle.stop()
+                    self.stats["preempted"] += 1
+                    return False
+                self._cond.wait(0.05)
+        self.stats["played"] += 1
+        return True
@@ -0,0 +1,199 @@
+from datetime import datetime
+import numpy as np
+from utils.features import HEALTH_FEATURES, Feature, FeatureSchema
+
+# Trend features: per-device mean, variance and slope (units per minute) of
+# each vital over the last `window` minutes, plus how many readings that
+# window holds. Training computes them from the timestamped CSV history and
+# HealthAgent from live readings, both through RollingVitals, so the model
+# sees the same numbers either way.
+STATS = ("mean", "var", "slope")
+
+def trend_schema(window):
+    features = list(HEALTH_FEATURES.features)
+    for f in HEALTH_FEATURES.features:
+        features.append(Feature(f"{f.name}_mean", f"{f.name}_mean", f.low, f.high))
+        features.append(Feature(f"{f.name}_var", f"{f.name}_var", 0, float("inf")))
+        features.append(Feature(f"{f.name}_slope", f"{f.name}_slope", float("-inf"), float("inf")))
+    features.append(Feature("window_readings", "window_readings", 1, float("inf")))
+    return FeatureSchema(features, trend_window=window)
+
+def health_schema(trend_window=None):
+    # Schema for a model trained with (or without) trend features
+    return trend_schema(trend_window) if trend_window else HEALTH_FEATURES
+
+EPOCH = datetime(1970, 1, 1)
+
+def timestamp_minutes(timestamps):
+    # ISO 8601 timestamp strings ("2025-01-22 20:42:00") -> minutes since the
+    # epoch, read as naive local time like the CSV history; unparseable ones
+    # count as now
+    now = (datetime.now() - EPOCH).total_seconds() / 60
+    parsed = {}
+    minutes = np.empty(len(timestamps))
+    for i, ts in enumerate(timestamps):
+        if not isinstance(ts, str):
+            minutes[i] = now
+            continue
+        value = parsed.get(ts)
+        if value is None:
+            try:
+                dt = datetime.fromisoformat(ts)
+                if dt.tzinfo is not None:
+                    dt = dt.astimezone().replace(tzinfo=None)
+                value = (dt - EPOCH).total_seconds() / 60
+            except ValueError:
+                value = now
+            parsed[ts] = value
+        minutes[i] = value
+    return minutes
+
+class RollingVitals:
+    # Ring buffer of each device's recent readings plus running sums of t, t²,
+    # x, x² and t·x, so adding a reading and reading off the statistics is
+    # O(1) (expired readings are subtracted as they fall out of the window).
+    # A window holds at most `capacity` readings; past that the oldest go
+    # first. A reading older than the device's newest is counted at the
+    # newest time, so the buffer stays in time order.
+    REBASE = 8  # windows after which times are re-anchored and sums recomputed
+
+    def __init__(self, window, capacity=64, n_values=len(HEALTH_FEATURES)):
+        self.window = float(window)
+        self.capacity = capacity
+        self.n_values = n_values
+        self.slots = {}
+        self._size = 0
+        self._allocate(64)
+
+    def _allocate(self, size):
+        C, k = self.capacity, self.n_values
+        grown = {
+            "times": np.zeros((size, C)),           # minutes since the slot's anchor
+            "values": np.zeros((size, C, k), dtype=np.float32),
+            "start": np.zeros(size, dtype=np.intp),  # ring position of the oldest reading
+            "count": np.zeros(size, dtype=np.intp),
+            "anchor": np.zeros(size),
+            "newest": np.full(size, -np.inf),
+            "s_t": np.zeros(size), "s_tt": np.zeros(size),
+            "s_x": np.zeros((size, k)), "s_xx": np.zeros((size, k)), "s_tx": np.zeros((size, k)),
+        }
+        for name, array in grown.items():
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:len(old)] = old
+            setattr(self, name, array)
+
+    def _slot(self, device_id):
+        slot = self.slots.get(device_id)
+        if slot is None:
+            slot = self.slots[device_id] = self._size
+            self._size += 1
+            if self._size > len(self.count):
+                self._allocate(2 * len(self.count))
+        return slot
+
+    def __len__(self):
+        return self._size
+
+    def update(self, device_ids, times, X):
+        # Add readings (times in minutes, X of shape (n, n_values)) and return
+        # each one's trend features, computed right after it was added, as an
+        # (n, 3 * n_values + 1) float32 array in input order. Readings of the
+        # same device are applied in input order; readings of different devices
+        # in one round, vectorized.
+        slots = np.fromiter((self._slot(d) for d in device_ids), dtype=np.intp, count=len(device_ids))
+        times = np.asarray(times, dtype=np.float64)
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(slots), 3 * self.n_values + 1), dtype=np.float32)
+        if len(slots) == 0:
+            return out
+        # Round r holds every device's r-th reading in this batch
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        first = np.flatnonzero(np.r_[True, sorted_slots[1:] != sorted_slots[:-1]])
+        rank = np.empty(len(slots), dtype=np.intp)
+        rank[order] = np.arange(len(slots)) - np.repeat(first, np.diff(np.r_[first, len(slots)]))
+        by_round = np.argsort(rank, kind="stable")
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+        for r in range(len(bounds) - 1):
+            idx = by_round[bounds[r]:bounds[r + 1]]
+            S = slots[idx]
+            self._push(S, times[idx], X[idx])
+            out[idx] = self._stats(S)
+        return out
+
+    def _push(self, S, t, x):
+        C = self.capacity
+        t = np.maximum(t, self.newest[S])
+        self.newest[S] = t
+        rel = t - self.anchor[S]
+        # Drop readings that left the window, and the oldest of a full buffer
+        while True:
+            oldest = self.times[S, self.start[S]]
+            expired = (self.count[S] > 0) & ((oldest < rel - self.window) | (self.count[S] >= C))
+            if not expired.any():
+                break
+            E = S[expired]
+            pos = self.start[E]
+            old_t, old_x = self.times[E, pos], self.values[E, pos].astype(np.float64)
+            self.s_t[E] -= old_t
+            self.s_tt[E] -= old_t * old_t
+            self.s_x[E] -= old_x
+            self.s_xx[E] -= old_x * old_x
+            self.s_tx[E] -= old_t[:, None] * old_x
+            self.start[E] = (pos + 1) % C
+            self.count[E] -= 1
+
+        # Empty buffers restart from exact zeros; long-running ones are
+        # re-anchored now and then so t² stays small and rounding error from
+        # the running subtractions never accumulates
+        empty = self.count[S] == 0
+        stale = ~empty & (rel > self.REBASE * max(self.window, 1.0))
+        if empty.any():
+            E = S[empty]
+            self.anchor[E] = t[empty]
+            self.start[E] = 0
+            for sums in (self.s_t, self.s_tt, self.s_x, self.s_xx, self.s_tx):
+                sums[E] = 0
+        if stale.any():
+            self._rebase(S[stale])
+        rel = t - self.anchor[S]
+
+        pos = (self.start[S] + self.count[S]) % C
+        self.times[S, pos] = rel
+        self.values[S, pos] = x
+        self.count[S] += 1
+        x = x.astype(np.float64)
+        self.s_t[S] += rel
+        self.s_tt[S] += rel * rel
+        self.s_x[S] += x
+        self.s_xx[S] += x * x
+        self.s_tx[S] += rel[:, None] * x
+
+    def _rebase(self, R):
+        # Anchor at the oldest reading and recompute every sum from the buffer
+        C = self.capacity
+        shift = self.times[R, self.start[R]]
+        self.times[R] -= shift[:, None]
+        self.anchor[R] += shift
+        held = (np.arange(C)[None, :] - self.start[R][:, None]) % C < self.count[R][:, None]
+        t = np.where(held, self.times[R], 0.0)
+        x = np.where(held[:, :, None], self.values[R], 0).astype(np.float64)
+        self.s_t[R] = t.sum(axis=1)
+        self.s_tt[R] = (t * t).sum(axis=1)
+        self.s_x[R] = x.sum(axis=1)
+        self.s_xx[R] = (x * x).sum(axis=1)
+        self.s_tx[R] = (t[:, :, None] * x).sum(axis=1)
+
+    def _stats(self, S):
+        n = self.count[S].astype(np.float64)
+        s_t, s_x = self.s_t[S], self.s_x[S]
+        mean = s_x / n[:, None]
+        var = np.maximum(self.s_xx[S] / n[:, None] - mean * mean, 0)
+        denom = n * self.s_tt[S] - s_t * s_t
+        # Fewer than two distinct times: no trend
+        flat = denom <= 1e-9 * np.maximum(n * self.s_tt[S], 1)
+        slope = (n[:, None] * self.s_tx[S] - s_t[:, None] * s_x) / np.where(flat, 1, denom)[:, None]
+        slope[flat] = 0
+        stats = np.stack([mean, var, slope], axis=2).reshape(len(S), -1)
+        return np.column_stack([stats, n])
@@ -0,0 +1,240 @@
+from datetime import datetime, timedelta
+from utils.db import connect, get_writer
+
+# Per-device rollups of health_logs at 1-minute, 1-hour and 1-day buckets:
+# reading count, critical count and min/max/sum of each vital (mean = sum / n,
+# and sums merge across buckets). update() folds in raw rows past a
+# watermark id, prune() drops raw rows and fine buckets past their retention,
+# and series()/summary() answer history queries from the coarsest table that
+# can, plus any raw rows not rolled up yet.
+LEVELS = (  # (name, strftime bucket format, bucket seconds), coarsest first
+    ("1d", "%Y-%m-%d", 24 * 3600),
+    ("1h", "%Y-%m-%d %H", 3600),
+    ("1m", "%Y-%m-%d %H:%M", 60),
+)
+# Days each table keeps; None keeps everything. Raw rows only go once rolled up.
+RETENTION = {"raw": 30, "1m": 90, "1h": 2 * 365, "1d": None}
+
+VITALS = (("hr", "heart_rate"), ("sys", "bp_systolic"), ("dia", "bp_diastolic"))
+STATS = ["n", "critical"] + [f"{short}_{stat}" for short, _ in VITALS for stat in ("min", "max", "sum")]
+
+# Aggregates over raw rows in the column order of STATS
+RAW_STATS = "COUNT(*), SUM(is_critical), " + ", ".join(
+    f"MIN({column}), MAX({column}), SUM({column})" for _, column in VITALS)
+# The same for a single raw row
+READING_STATS = "1, is_critical, " + ", ".join(f"{column}, {column}, {column}" for _, column in VITALS)
+# The same over rollup rows
+MERGED_STATS = "SUM(n), SUM(critical), " + ", ".join(
+    f"MIN({short}_min), MAX({short}_max), SUM({short}_sum)" for short, _ in VITALS)
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def table(level):
+    return f"health_logs_{level}"
+
+def _upsert_sql(level, fmt):
+    merge = ", ".join(
+        f"{s} = {s} + excluded.{s}" if s in ("n", "critical") or s.endswith("_sum")
+        else f"{s} = {'MIN' if s.endswith('_min') else 'MAX'}({s}, excluded.{s})"
+        for s in STATS)
+    return f"""
+        INSERT INTO {table(level)} (device_id, bucket, {", ".join(STATS)})
+        SELECT device_id, strftime('{fmt}', timestamp), {RAW_STATS}
+        FROM health_logs
+        WHERE id > ? AND id <= ? AND device_id IS NOT NULL
+        GROUP BY 1, 2 HAVING strftime('{fmt}', timestamp) IS NOT NULL
+        ON CONFLICT (device_id, bucket) DO UPDATE SET {merge}
+    """
+
+def _combine(a, b):
+    # Merge two STATS rows (either may be None or hold NULLs for an empty range)
+    if a is None or not a[0]:
+        return b
+    if b is None or not b[0]:
+        return a
+    merged = [a[0] + b[0], (a[1] or 0) + (b[1] or 0)]
+    for i in range(2, len(STATS), 3):
+        merged += [min(a[i], b[i]), max(a[i + 1], b[i + 1]), a[i + 2] + b[i + 2]]
+    return merged
+
+def _result(stats):
+    # STATS row -> {"n", "critical", "heart_rate": (min, mean, max), ...}
+    if stats is None or not stats[0]:
+        return {"n": 0, "critical": 0}
+    result = {"n": stats[0], "critical": stats[1] or 0}
+    for k, (_, column) in enumerate(VITALS):
+        low, high, total = stats[2 + 3 * k: 5 + 3 * k]
+        result[column] = (low, total / stats[0], high)
+    return result
+
+def _floor(moment, seconds):
+    # Start of the bucket holding `moment` (days from local midnight)
+    if seconds >= 24 * 3600:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + timedelta(seconds=(moment - midnight).total_seconds() // seconds * seconds)
+
+def _parse(moment):
+    return datetime.fromisoformat(moment) if isinstance(moment, str) else moment
+
+class HealthRollups:
+    def __init__(self, db_path="db/memory.sqlite"):
+        self.db_path = db_path
+        conn = connect(db_path)
+        for level, _, _ in LEVELS:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table(level)} (
+                    device_id TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    {", ".join(f"{s} INTEGER" for s in STATS)},
+                    PRIMARY KEY (device_id, bucket)
+                ) WITHOUT ROWID
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table(level)}_bucket ON {table(level)} (bucket)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rollup_watermarks (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)")
+        conn.commit()
+        self.writer = get_writer(db_path)
+        self.upserts = [_upsert_sql(level, fmt) for level, fmt, _ in LEVELS]
+
+    def watermark(self):
+        row = connect(self.db_path).execute(
+            "SELECT last_id FROM rollup_watermarks WHERE name = 'health_logs'").fetchone()
+        return row[0] if row else 0
+
+    def update(self, batch=200_000):
+        # Fold raw rows past the watermark into every rollup, `batch` rows per
+        # transaction, until caught up; returns how many rows were folded in.
+        # Buckets and watermark commit together, so a crash never counts a row
+        # twice or skips it. Run from one process only.
+        conn = connect(self.db_path)
+        done = 0
+        while True:
+            last = self.watermark()
+            upper, count = conn.execute(
+                "SELECT MAX(id), COUNT(*) FROM (SELECT id FROM health_logs WHERE id > ? ORDER BY id LIMIT ?)",
+                (last, batch)).fetchone()
+            if not count:
+                return done
+            statements = [(sql, (last, upper)) for sql in self.upserts]
+            statements.append(("INSERT INTO rollup_watermarks (name, last_id) VALUES ('health_logs', ?) "
+                               "ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id", (upper,)))
+            self.writer.transaction(statements)
+            self.writer.flush()
+            if self.watermark() != upper:
+                raise RuntimeError("health_logs rollup did not commit")
+            done += count
+            if count < batch:
+                return done
+
+    def prune(self, now=None, batch=50_000):
+        # Drop rolled-up raw rows and rollup buckets older than RETENTION;
+        # returns rows deleted per table
+        now = now or datetime.now()
+        conn = connect(self.db_path)
+        deleted = {}
+        if RETENTION["raw"] is not None:
+            cutoff = (now - timedelta(days=RETENTION["raw"])).strftime(TIME_FORMAT)
+            last = self.watermark()
+            total = 0
+            while True:
+                # Oldest ids first, so each pass scans little beyond what it deletes
+                ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM health_logs WHERE id <= ? AND timestamp < ? ORDER BY id LIMIT ?",
+                    (last, cutoff, batch))]
+                if not ids:
+                    break
+                self.writer.execute("DELETE FROM health_logs WHERE id >= ? AND id <= ? AND timestamp < ?",
+                                    (ids[0], ids[-1], cutoff))
+                self.writer.flush()
+                total += len(ids)
+            deleted["raw"] = total
+        for level, fmt, _ in LEVELS:
+            if RETENTION[level] is None:
+                continue
+            cutoff = (now - timedelta(days=RETENTION[level])).strftime(fmt)
+            deleted[level] = conn.execute(f"SELECT COUNT(*) FROM {table(level)} WHERE bucket < ?",
+                                          (cutoff,)).fetchone()[0]
+            if deleted[level]:
+                self.writer.execute(f"DELETE FROM {table(level)} WHERE bucket < ?", (cutoff,))
+        self.writer.flush()
+        return deleted
+
+    def pick_level(self, start, step=None, now=None):
+        # Coarsest rollup whose buckets are no wider than `step` seconds and
+        # that still holds `start`; None means raw rows
+        now = now or datetime.now()
+        held = [(level, fmt, seconds) for level, fmt, seconds in LEVELS
+                if RETENTION[level] is None or start >= now - timedelta(days=RETENTION[level])]
+        for level, fmt, seconds in held:
+            if step is None or seconds <= step:
+                return level, fmt, seconds
+        if step is not None and step < 60 and start >= now - timedelta(days=RETENTION["raw"]):
+            return None
+        # Nothing fine enough is kept that far back: the finest that is
+        return held[-1] if held else None
+
+    def series(self, device_id, start, end, step=None, now=None):
+        # [(bucket, stats)] for [start, end), from the table picked by
+        # pick_level; rows newer than the watermark are bucketed on the fly.
+        # Returns (level, rows); level None means one row per raw reading.
+        start, end = _parse(start), _parse(end)
+        conn = connect(self.db_path)
+        picked = self.pick_level(start, step, now)
+        if picked is None:
+            rows = conn.execute(
+                f"SELECT timestamp, {READING_STATS} FROM health_logs WHERE device_id = ? AND timestamp >= ? "
+                f"AND timestamp < ? ORDER BY timestamp",
+                (device_id, start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT))).fetchall()
+            return None, [(row[0], _result(row[1:])) for row in rows]
+        level, fmt, seconds = picked
+        lo, hi = _floor(start, seconds).strftime(fmt), (end - timedelta(microseconds=1)).strftime(fmt)
+        buckets = {row[0]: list(row[1:]) for row in conn.execute(
+            f"SELECT bucket, {', '.join(STATS)} FROM {table(level)} WHERE device_id = ? AND bucket >= ? "
+            f"AND bucket <= ? ORDER BY bucket", (device_id, lo, hi))}
+        for row in conn.execute(
+                f"SELECT strftime('{fmt}', timestamp) AS bucket, {RAW_STATS} FROM health_logs "
+                f"WHERE device_id = ? AND id > ? AND timestamp >= ? AND timestamp < ? GROUP BY bucket",
+                (device_id, self.watermark(), start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT))):
+            if row[0] is not None:
+                buckets[row[0]] = _combine(buckets.get(row[0]), list(row[1:]))
+        return level, [(bucket, _result(buckets[bucket])) for bucket in sorted(buckets)]
+
+    def summary(self, device_id, start, end):
+        # Totals for [start, end): the range is split into whole days, then
+        # whole hours and minutes at the edges, then raw seconds, each read
+        # from its table. Exact while the edge rows are within retention.
+        start, end = _parse(start), _parse(end)
+        conn = connect(self.db_path)
+        watermark = self.watermark()
+        stats = None
+        for level, lo, hi in self._pieces(start, end, 0):
+            if level is None:
+                stats = _combine(stats, conn.execute(
+                    f"SELECT {RAW_STATS} FROM health_logs WHERE device_id = ? AND timestamp >= ? AND timestamp < ?",
+                    (device_id, lo.strftime(TIME_FORMAT), hi.strftime(TIME_FORMAT))).fetchone())
+                continue
+            _, fmt, _ = LEVELS[level]
+            stats = _combine(stats, conn.execute(
+                f"SELECT {MERGED_STATS} FROM {table(LEVELS[level][0])} WHERE device_id = ? AND bucket >= ? "
+                f"AND bucket < ?", (device_id, lo.strftime(fmt), hi.strftime(fmt))).fetchone())
+            # Readings in this span that have not been rolled up yet
+            stats = _combine(stats, conn.execute(
+                f"SELECT {RAW_STATS} FROM health_logs WHERE device_id = ? AND id > ? AND timestamp >= ? "
+                f"AND timestamp < ?", (device_id, watermark, lo.strftime(TIME_FORMAT),
+                                      hi.strftime(TIME_FORMAT))).fetchone())
+        return _result(stats)
+
+    def _pieces(self, lo, hi, k):
+        # (LEVELS index or None for raw, start, end) spans covering [lo, hi)
+        if lo >= hi:
+            return []
+        if k == len(LEVELS):
+            return [(None, lo, hi)]
+        seconds = LEVELS[k][2]
+        first = _floor(lo, seconds)
+        if first < lo:
+            first += timedelta(seconds=seconds)
+        last = _floor(hi, seconds)
+        if first >= last:
+            return self._pieces(lo, hi, k + 1)
+        return self._pieces(lo, first, k + 1) + [(k, first, last)] + self._pieces(last, hi, k + 1)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TickStats:
+    # Latency of the last `window` ticks plus lifetime counters for one agent
+    def __init__(self, window=256):
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.max = 0.0
+
+    def record(self, latency):
+        self.recent.append(latency)
+        self.count += 1
+        self.max = max(self.max, latency)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        n = len(recent)
+        return {
+            "ticks": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "mean_ms": round(sum(recent) / n * 1000, 1) if n else None,
+            "p50_ms": round(recent[n // 2] * 1000, 1) if n else None,
+            "p95_ms": round(recent[min(n - 1, int(n * 0.95))] * 1000, 1) if n else None,
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class AgentScheduler:
+    # Runs each agent on its own cadence as an asyncio task. Agent code is
+    # blocking (sqlite, HTTP, audio), so every agent gets a private
+    # single-thread executor: a hung agent only ever ties up its own thread,
+    # and its next ticks are skipped rather than piling up behind it.
+    def __init__(self):
+        self.jobs = {}
+        self.stats = {}
+        self.executors = {}
+
+    def add(self, name, func=None, interval=None, timeout=None):
+        # interval is seconds or a callable returning seconds; func=None
+        # registers an agent that only runs work handed to it via submit()
+        self.jobs[name] = (func, interval, timeout)
+        self.stats[name] = TickStats()
+        self.executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def submit(self, name, func, *args):
+        # Hand work to another agent's thread without waiting for it; safe to
+        # call from inside any agent's tick
+        stats = self.stats[name]
+
+        def timed():
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as e:
+                stats.errors += 1
+                print(f"❌ {name} failed: {e}")
+            else:
+                stats.record(time.perf_counter() - start)
+
+        return self.executors[name].submit(timed)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    async def _run_job(self, name, func, interval, timeout):
+        loop = asyncio.get_running_loop()
+        stats = self.stats[name]
+        pending = None
+        while True:
+            start = time.perf_counter()
+            if pending is not None and not pending.done():
+                stats.skipped += 1
+            else:
+                pending = loop.run_in_executor(self.executors[name], func)
+                try:
+                    # shield() so a timeout leaves the call running and visible as pending
+                    await asyncio.wait_for(asyncio.shield(pending), timeout)
+                    stats.record(time.perf_counter() - start)
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    print(f"⚠️ {name} tick exceeded {timeout}s")
+                except Exception as e:
+                    stats.errors += 1
+                    print(f"❌ {name} failed: {e}")
+            delay = interval() if callable(interval) else interval
+            await asyncio.sleep(max(0.0, delay - (time.perf_counter() - start)))
+
+    async def run(self):
+        tasks = [asyncio.create_task(self._run_job(name, func, interval, timeout), name=name)
+                 for name, (func, interval, timeout) in self.jobs.items() if func is not None]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for executor in self.executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
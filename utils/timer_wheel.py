@@ -0,0 +1,68 @@
+import math
+
+class TimerWheel:
+    # Hashed timing wheel: one deadline per key, kept in the slot for its tick
+    # (deadline // resolution) modulo the number of slots. Setting, moving or
+    # cancelling a deadline is O(1); expire() only visits the slots between
+    # the last call and now, and fires each deadline exactly once. Deadlines
+    # more than one revolution ahead share a slot with nearer ones and are
+    # skipped until their round comes up.
+    def __init__(self, start, resolution=1.0, slots=512):
+        self.resolution = resolution
+        self.slots = [set() for _ in range(slots)]
+        self.deadlines = {}  # key -> tick
+        self.current = int(start // resolution)  # first tick not yet expired
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def schedule(self, key, when):
+        # (Re)arm `key` to fire once the clock reaches `when`, never early and
+        # at most one resolution late. Overdue deadlines fire on the next expire().
+        tick = max(math.ceil(when / self.resolution), self.current)
+        old = self.deadlines.get(key)
+        if old is not None:
+            self.slots[old % len(self.slots)].discard(key)
+        self.deadlines[key] = tick
+        self.slots[tick % len(self.slots)].add(key)
+
+    def cancel(self, key):
+        tick = self.deadlines.pop(key, None)
+        if tick is not None:
+            self.slots[tick % len(self.slots)].discard(key)
+
+    def expire(self, now):
+        # Remove and return every key whose deadline is at or before `now`
+        target = int(now // self.resolution)
+        fired = []
+        if target < self.current:
+            return fired
+        n = len(self.slots)
+        deadlines = self.deadlines
+        for tick in range(self.current, min(target, self.current + n - 1) + 1):
+            slot = self.slots[tick % n]
+            if not slot:
+                continue
+            due = [key for key in slot if deadlines[key] <= target]
+            if len(due) == len(slot):
+                slot.clear()
+            else:
+                slot.difference_update(due)
+            for key in due:
+                del deadlines[key]
+            fired.extend(due)
+        self.current = target + 1
+        return fired
+
+    def next_deadline(self):
+        # Time of the earliest deadline within one revolution, else None
+        n = len(self.slots)
+        deadlines = self.deadlines
+        for tick in range(self.current, self.current + n):
+            slot = self.slots[tick % n]
+            if slot and any(deadlines[key] == tick for key in slot):
+                return tick * self.resolution
+        return None
@@ -1,15 +1,100 @@
 from gtts import gTTS
+import argparse
+import hashlib
 import os
-import platform
-
-def speak(text, lang='ta'):
-    tts = gTTS(text=text, lang=lang)
-    tts.save("output.mp3")
-    system = platform.system()
-    if system == "Windows":
-        os.system("start output.mp3")
-    elif system == "Darwin":
-        os.system("afplay output.mp3")
-    else:
-        os.system("mpg123 output.mp3")
+import threading
+from utils.playback import PRIORITY_REMINDER, PlaybackQueue, SubprocessBackend
+
+# Synthesized phrases are kept on disk keyed by a hash of (lang, text), so the
+# handful of phrases agents repeat all day play instantly and work offline.
+CACHE_DIR = "audio/cache"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+def cache_path(text, lang):
+    key = hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.mp3")
+
+def synthesize(text, lang='ta'):
+    path = cache_path(text, lang)
+    if os.path.exists(path):
+        os.utime(path)  # mark as recently used for LRU eviction
+        return path
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        gTTS(text=text, lang=lang).save(tmp)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)  # atomic, so a concurrent reader never sees a partial file
+    evict()
+    return path
+
+def evict(max_bytes=CACHE_MAX_BYTES):
+    # Drop least recently used files until the cache fits in max_bytes
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".mp3"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+_queue = None
+_queue_lock = threading.Lock()
 
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = PlaybackQueue(SubprocessBackend(), synthesize).start()
+        return _queue
+
+def set_backend(backend, synthesize=None):
+    # Swap the player (e.g. NullBackend on a headless server, RecordingBackend in
+    # tests) and optionally the synthesizer, e.g. a local offline engine
+    queue = get_queue()
+    queue.backend = backend
+    if synthesize is not None:
+        queue.synthesize = synthesize
+
+def speak(text, lang='ta', priority=PRIORITY_REMINDER):
+    # Returns immediately; synthesis and playback happen on the playback thread
+    get_queue().put(text, lang, priority)
+
+def prewarm(db_path="db/memory.sqlite"):
+    # Synthesize every fixed phrase ahead of time: social chatter and all reminders
+    from agents.social import SocialAgent
+    from utils.db import connect
+
+    phrases = [(text, lang) for lang, texts in SocialAgent().messages.items() for text in texts]
+    phrases += connect(db_path).execute("SELECT DISTINCT message, language FROM reminders").fetchall()
+    warmed = 0
+    for text, lang in phrases:
+        cached = os.path.exists(cache_path(text, lang))
+        try:
+            synthesize(text, lang)
+        except Exception as e:
+            print(f"❌ [{lang}] {text}: {e}")
+            continue
+        warmed += 1
+        print(f"{'✅ cached' if cached else '🔊 synthesized'} [{lang}] {text}")
+    return warmed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Text-to-speech cache tools")
+    parser.add_argument("--prewarm", action="store_true", help="synthesize social messages and reminders into the cache")
+    parser.add_argument("--db", default="db/memory.sqlite")
+    args = parser.parse_args()
+    if args.prewarm:
+        print(f"Pre-warmed {prewarm(args.db)} phrases into {CACHE_DIR}")
+    else:
+        parser.print_help()